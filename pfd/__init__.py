@@ -5,4 +5,19 @@
  https://opensource.org/licenses/MIT
 """
 
-from .pfd import AircraftState, PrimaryFlightDisplay
\ No newline at end of file
+import os
+
+### keep stdout clean for the reports and frames written to it (python -m pfd.bench > report.json, raw video pipes)
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from .pfd import AircraftState, PrimaryFlightDisplay
+from .series import AircraftStateSeries
+from .batch import iter_frames, write_frames
+from .parallel import render_parallel
+from .flightlog import FlightLog, FlightLogWriter, write_flight_log
+from .interpolation import StateBuffer
+from .live import LiveRunner, run_udp
+from .grid import PFDGrid
+from .fonts import set_text_cache_capacity, text_cache_stats
+from .assets import assets_stats, set_assets_capacity
+from .governor import QualityGovernor
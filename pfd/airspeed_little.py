@@ -8,7 +8,12 @@
 import numpy as np
 import pygame
 
-from .common import get_digit, quit_out_range
+from .assets import get_assets
+from .common import alpha_surface, get_digit, quit_out_range
+from .drum import get_drum
+from .fonts import get_font, render_text
+from .layers import StaticLayer
+from .tape import get_tape_strip
 
 
 class AirspeedIndicatorLittle:
@@ -21,8 +26,7 @@ class AirspeedIndicatorLittle:
         self.width = self.size / 5
         self.position = kwargs.get("position", (0, 0))
 
-        self.background = pygame.Surface((self.width, self.height))
-        self.background = self.background.convert_alpha()
+        self.background = alpha_surface((self.width, self.height))
         self.background_rect = self.background.get_rect()
         self.background_rect.midright = self.position
         self.background_color = pygame.Color(100, 100, 100, 200)
@@ -40,13 +44,24 @@ class AirspeedIndicatorLittle:
         self.line_width2 = int(1 + self.size // 400)
         self.line_width3 = int(1 + self.size // 200)
 
-        self.marks_font = pygame.font.SysFont("helvetica", int(self.size // 16.5))
-        self.digits_font = pygame.font.SysFont("helvetica", int(self.size // 15.0))
-        self.command_font = pygame.font.SysFont("helvetica", int(self.size // 10.5))
+        self.marks_font_size = int(self.size // 16.5)
+        self.marks_font = get_font("helvetica", self.marks_font_size)
+        self.digits_font_size = int(self.size // 15.0)
+        self.digits_font = get_font("helvetica", self.digits_font_size)
+        self.command_font_size = int(self.size // 10.5)
+        self.command_font = get_font("helvetica", self.command_font_size)
         self.command_separation = int(self.size // 100.0)
 
-        ### pre-compute all constant shapes
-        self.build_constant_elements()
+        self.tape_strips = kwargs.get("tape_strips", False)
+        self.layered = kwargs.get("layered", False)
+        ### dynamic texts (digits, command value) can be rendered without antialiasing
+        self.antialias = kwargs.get("antialias", True)
+
+        ### pre-compute all constant shapes, shared with the indicators of the same size and place
+        key = (type(self).__name__, self.screen_rect.size, self.size, self.position, self.tape_strips, self.layered)
+        vars(self).update(get_assets(key, self, self.build_constant_elements))
+        ### the digits are drawn on the box every frame, each indicator needs its own
+        self.box_surface = pygame.Surface(self.box_surface_rect.size)
 
         ### initialize
         self.update(0.0)
@@ -63,8 +78,7 @@ class AirspeedIndicatorLittle:
             (self.background_rect.left + self.box_size, self.background_rect.centery + self.box_size / 2),
             (self.background_rect.left, self.background_rect.centery + self.box_size / 2),
         ]
-        self.box_surface = pygame.Surface((self.box_size, self.box_size - 8))
-        self.box_surface_rect = self.box_surface.get_rect()
+        self.box_surface_rect = pygame.Rect(0, 0, int(self.box_size), int(self.box_size - 8))
         self.box_surface_rect.midleft = self.background_rect.midleft
         self.digits_display_rect = pygame.draw.polygon(
             self.screen, (255, 255, 255), self.box_poly, width=self.line_width3
@@ -75,6 +89,10 @@ class AirspeedIndicatorLittle:
         self.digit2_pos = (self.box_size * 0.50, self.box_size * 0.5 - 3)
         self.digit1_pos = (self.box_size * 0.75, self.box_size * 0.5 - 3)
 
+        ### rolling units drum
+        digits = [f"{num}" for num in range(10)]
+        self.digit1_drum = get_drum(digits, self.digits_font_size, (255, 255, 255), self.box_size * 0.5)
+
         ### command mark
         self.command_mark_color = pygame.Color("#F000FF")
         self.command_mark_original = [
@@ -96,6 +114,30 @@ class AirspeedIndicatorLittle:
         #     (self.background_rect.right + self.width / 3, self.background_rect.bottom),
         # )
 
+        ### only numbers, so that the shared tape strip keeps no reference to this indicator
+        self.marks_geometry = dict(
+            width=self.background_rect.size[0],
+            lines_length=self.lines_length,
+            lines_length2=self.lines_length2,
+            line_width=self.line_width2,
+            font_size=self.marks_font_size,
+        )
+
+        ### pre-rendered tape strip
+        self.tape_strip = None
+        if self.tape_strips:
+            self.tape_strip = get_tape_strip(
+                (type(self).__name__, self.size),
+                self.width,
+                self.airspeed2heigth,
+                2.5,
+                self.draw_mark,
+                mark_geometry=self.marks_geometry,
+                tile_height=self.height,
+                margin=(self.marks_font.get_height() + self.line_width2) / self.airspeed2heigth,
+                min_value=0.0,
+            )
+
         ### render rectangle
         x = self.background_rect.x - 5
         y = self.background_rect.y - 38 - 5
@@ -103,39 +145,62 @@ class AirspeedIndicatorLittle:
         h = self.height + 38 + 10
         self.render_rect = pygame.Rect(x, y, w, h)
 
+        ### borders and digits box outline never move, composite them in one blit
+        self.static_layer = None
+        if self.layered:
+            self.static_layer = StaticLayer(self.screen_rect.size, self.draw_static_elements)
+
+    @staticmethod
+    def draw_mark(
+        surface: pygame.Surface,
+        mark: float,
+        posy: float,
+        width: int,
+        lines_length: float,
+        lines_length2: float,
+        line_width: int,
+        font_size: int,
+    ) -> None:
+        p1 = (width, posy)
+        if mark % 5 == 0:
+            p2 = (width - lines_length2, posy)
+            pygame.draw.line(surface, (255, 255, 255), p1, p2, width=line_width)
+            airspeed_num = render_text(f"{mark:.0f}", font_size, (255, 255, 255))
+            airspeed_num_rect = airspeed_num.get_rect()
+            airspeed_num_rect.midright = (width - lines_length2 * 1.2, posy)
+            surface.blit(airspeed_num, airspeed_num_rect)
+        else:
+            p2 = (width - lines_length, posy)
+            pygame.draw.line(surface, (255, 255, 255), p1, p2, width=line_width)
+
     def draw_lines(self) -> None:
+        if self.tape_strip is not None:
+            self.tape_strip.draw(self.background, self.airspeed, self.vmid)
+            return
         max_airspeed_mark = self.bar_max_airspeed//2.5*2.5
         marks = np.arange(0, max_airspeed_mark + 2.5, 2.5)
         for mark in quit_out_range(marks, self.bar_min_airspeed, self.bar_max_airspeed):
             incy = (self.airspeed - mark) * self.airspeed2heigth
-            p1 = (self.background_rect.size[0], self.vmid + incy)
-            if mark % 5 == 0:
-                p2 = (self.background_rect.size[0] - self.lines_length2, self.vmid + incy)
-                pygame.draw.line(self.background, (255, 255, 255), p1, p2, width=self.line_width2)
-                airspeed_num = self.marks_font.render(f"{mark:.0f}", True, (255, 255, 255))
-                airspeed_num_rect = airspeed_num.get_rect()
-                airspeed_num_rect.midright = (self.background_rect.size[0] - self.lines_length2 * 1.2, self.vmid + incy)
-                self.background.blit(airspeed_num, airspeed_num_rect)
-            else:
-                p2 = (self.background_rect.size[0] - self.lines_length, self.vmid + incy)
-                pygame.draw.line(self.background, (255, 255, 255), p1, p2, width=self.line_width2)
-                
+            self.draw_mark(self.background, mark, self.vmid + incy, **self.marks_geometry)
+
     def draw_digits_display(self) -> None:
         pygame.draw.polygon(self.screen, (0, 0, 0), self.box_poly)
 
-        digit1_value = get_digit(self.airspeed, 0)
-        digit2_value = get_digit(self.airspeed, 1)
-        digit3_value = get_digit(self.airspeed, 2)
+        digit1_value = self.digit1_value
+        digit2_value = self.digit2_value
+        digit3_value = self.digit3_value
 
         self.box_surface.fill((0, 0, 0))
         
-        fract_part = np.modf(self.airspeed)[0]
+        fract_part = self.fract_part
 
         if digit3_value > 99.5:
             if digit2_value == 9 and digit1_value == 9 and fract_part > 0.5:
                 digit3_value += 1
                 digit3_value %= 10
-            digit3 = self.digits_font.render(f"{digit3_value:.0f}", True, (255, 255, 255))
+            digit3 = render_text(
+                f"{digit3_value:.0f}", self.digits_font_size, (255, 255, 255), antialias=self.antialias
+            )
             digit3_rect = digit3.get_rect()
             digit3_rect.center = self.digit3_pos
             self.box_surface.blit(digit3, digit3_rect)
@@ -144,23 +209,15 @@ class AirspeedIndicatorLittle:
         if digit1_value == 9 and fract_part > 0.5:
             digit2_value += 1
             digit2_value %= 10
-        digit2 = self.digits_font.render(f"{digit2_value:.0f}", True, (255, 255, 255))
+        digit2 = render_text(f"{digit2_value:.0f}", self.digits_font_size, (255, 255, 255), antialias=self.antialias)
         digit2_rect = digit2.get_rect()
         digit2_rect.center = self.digit2_pos
         self.box_surface.blit(digit2, digit2_rect)
 
-        for num in np.arange(digit1_value - 2, digit1_value + 3, 1):
-            incy = (fract_part + digit1_value - num) * 0.5
-            num %= 10
-            digit1 = self.digits_font.render(f"{num:.0f}", True, (255, 255, 255))
-            digit1_rect = digit1.get_rect()
-            digit1_rect.center = (self.digit1_pos[0], self.box_size * (0.5 + incy) - 3)
-            self.box_surface.blit(digit1, digit1_rect)
+        self.digit1_drum.draw(self.box_surface, digit1_value + fract_part, self.digit1_pos)
 
         self.screen.blit(self.box_surface, self.box_surface_rect)
 
-        pygame.draw.polygon(self.screen, (255, 255, 255), self.box_poly, width=self.line_width3)
-
     def draw_command_mark(self):
         if self.bar_min_airspeed < self.command < self.bar_max_airspeed:
             incy = (self.airspeed - self.command) * self.airspeed2heigth
@@ -173,55 +230,74 @@ class AirspeedIndicatorLittle:
             ]
             pygame.draw.polygon(self.screen, self.command_mark_color, command_mark, width=self.line_width3)
 
-        command_value = self.command_font.render(f"{self.command:.0f}", True, self.command_mark_color)
+        command_value = render_text(
+            f"{self.command:.0f}", self.command_font_size, self.command_mark_color, antialias=self.antialias
+        )
         command_value_rect = command_value.get_rect()
         command_value_rect.midbottom = self.background_rect.midtop
         command_value_rect.move_ip(0, -self.command_separation)
         self.screen.blit(command_value, command_value_rect)
 
-    def draw_border_lines(self) -> None:
+    def draw_border_lines(self, surface: pygame.Surface) -> None:
         # pygame.draw.line(self.screen, (255, 255, 255), self.border_line_v[0], self.border_line_v[1], width=self.line_width3)
         # pygame.draw.line(self.screen, (255, 255, 255), self.border_line_h1[0], self.border_line_h1[1], width=self.line_width3)
         # pygame.draw.line(self.screen, (255, 255, 255), self.border_line_h2[0], self.border_line_h2[1], width=self.line_width3)
         pygame.draw.line(
-            self.screen,
+            surface,
             (255, 255, 255),
             self.background_rect.topright,
             self.background_rect.bottomright,
             width=self.line_width3,
         )
         pygame.draw.line(
-            self.screen,
+            surface,
             (255, 255, 255),
             self.background_rect.topleft,
             self.background_rect.topright,
             width=self.line_width3,
         )
         pygame.draw.line(
-            self.screen,
+            surface,
             (255, 255, 255),
             self.background_rect.bottomleft,
             self.background_rect.bottomright,
             width=self.line_width3,
         )
 
-    def update(self, airspeed: float, command: float = None) -> None:
-        self.airspeed = np.clip(airspeed, 0.0, None)
+    def draw_static_elements(self, surface: pygame.Surface) -> None:
+        self.draw_border_lines(surface)
+        pygame.draw.polygon(surface, (255, 255, 255), self.box_poly, width=self.line_width3)
 
-        if command is None:
-            self.command = None
-        else:
-            self.command = np.clip(command, 0.0, None)
+    def compute_update(self, airspeed, command=None) -> dict:
+        ### works on scalars and on whole arrays of samples
+        airspeed = np.clip(airspeed, 0.0, None)
 
-        self.bar_min_airspeed = self.airspeed - self.indicator_range
-        self.bar_max_airspeed = self.airspeed + self.indicator_range
+        if not command is None:
+            command = np.clip(command, 0.0, None)
+
+        return {
+            "airspeed": airspeed,
+            "command": command,
+            "bar_min_airspeed": airspeed - self.indicator_range,
+            "bar_max_airspeed": airspeed + self.indicator_range,
+            "digit1_value": get_digit(airspeed, 0),
+            "digit2_value": get_digit(airspeed, 1),
+            "digit3_value": get_digit(airspeed, 2),
+            "fract_part": np.modf(airspeed)[0],
+        }
+
+    def update(self, airspeed: float, command: float = None) -> None:
+        vars(self).update(self.compute_update(airspeed, command))
 
     def draw(self) -> pygame.Rect:
         self.background.fill(self.background_color)
         self.draw_lines()
         self.screen.blit(self.background, self.background_rect)
-        self.draw_border_lines()
         self.draw_digits_display()
+        if self.static_layer is None:
+            self.draw_static_elements(self.screen)
+        else:
+            self.static_layer.draw(self.screen)
         if not self.command is None:
             self.draw_command_mark()
         return self.render_rect
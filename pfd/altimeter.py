@@ -8,7 +8,12 @@
 import numpy as np
 import pygame
 
-from .common import get_digit, quit_out_range
+from .assets import get_assets
+from .common import alpha_surface, get_digit, quit_out_range
+from .drum import get_drum
+from .fonts import get_font, render_text
+from .layers import StaticLayer
+from .tape import get_tape_strip
 
 
 class AltitudeIndicator:
@@ -24,8 +29,7 @@ class AltitudeIndicator:
         self.vmid = self.height / 2
         self.hmid = self.width / 2
 
-        self.background = pygame.Surface((self.width, self.height))
-        self.background = self.background.convert_alpha()
+        self.background = alpha_surface((self.width, self.height))
         self.background_rect = self.background.get_rect()
         self.background_rect.midleft = self.position
         self.background_color = pygame.Color(100, 100, 100, 200)
@@ -51,7 +55,16 @@ class AltitudeIndicator:
         self.digit_font_size1 = int(self.size // 15.5)
         self.digit_font_size2 = int(self.size // 19.5)
 
-        self.build_constant_elements()
+        self.tape_strips = kwargs.get("tape_strips", False)
+        self.layered = kwargs.get("layered", False)
+        ### dynamic texts (digits, command value) can be rendered without antialiasing
+        self.antialias = kwargs.get("antialias", True)
+
+        ### pre-compute all constant shapes, shared with the indicators of the same size and place
+        key = (type(self).__name__, self.screen_rect.size, self.size, self.position, self.tape_strips, self.layered)
+        vars(self).update(get_assets(key, self, self.build_constant_elements))
+        ### the digits are drawn on the box every frame, each indicator needs its own
+        self.box_surface = pygame.Surface(self.box_surface_rect.size)
 
         self.update(0.0)
 
@@ -67,8 +80,7 @@ class AltitudeIndicator:
             (self.background_rect.right - self.box_size, self.background_rect.centery + self.box_size / 2),
             (self.background_rect.right + self.box_size / 3, self.background_rect.centery + self.box_size / 2),
         ]
-        self.box_surface = pygame.Surface((self.box_size * (4 / 3), self.box_size - 8))
-        self.box_surface_rect = self.box_surface.get_rect()
+        self.box_surface_rect = pygame.Rect(0, 0, int(self.box_size * (4 / 3)), int(self.box_size - 8))
         self.box_surface_rect.midright = (self.background_rect.right + self.box_size / 3, self.background_rect.centery)
         self.digits_display_rect = pygame.draw.polygon(
             self.screen, (255, 255, 255), self.box_poly, width=self.line_width3
@@ -80,6 +92,13 @@ class AltitudeIndicator:
         self.digit3_pos = (self.box_size * 0.725, self.box_size * 0.5 - 3)
         self.digit12_pos = (self.box_size * 1.0, self.box_size * 0.5 - 3)
 
+        ### rolling last two digits drums, white and red (below zero)
+        digits = [f"{num:02d}" for num in range(0, 100, 20)]
+        self.digit12_drums = {
+            color: get_drum(digits, self.digit_font_size2, color, self.box_size * 0.36)
+            for color in ((255, 255, 255), (255, 0, 0))
+        }
+
         ### command mark
         self.command_mark_color = pygame.Color("#F000FF")
         self.command_mark_original = [
@@ -103,6 +122,31 @@ class AltitudeIndicator:
         #     (self.background_rect.left - self.width / 3, self.background_rect.bottom),
         # )
 
+        ### only numbers, so that the shared tape strip keeps no reference to this indicator
+        self.marks_geometry = dict(
+            lines_length=self.lines_length,
+            lines_length2=self.lines_length2,
+            line_width=self.line_width2,
+            line_width_thick=self.line_width4,
+            font_size=self.marks_font_size,
+            font_separation=self.marks_font_separation,
+        )
+
+        ### pre-rendered tape strip
+        self.tape_strip = None
+        if self.tape_strips:
+            marks_font_height = get_font("helvetica", self.marks_font_size).get_height()
+            self.tape_strip = get_tape_strip(
+                (type(self).__name__, self.size),
+                self.width,
+                self.altitude2heigth,
+                100.0,
+                self.draw_mark,
+                mark_geometry=self.marks_geometry,
+                tile_height=self.height,
+                margin=(marks_font_height + self.line_width4) / self.altitude2heigth,
+            )
+
         ### render rectangle
         x = self.background_rect.x - self.box_size * 0.33 - 5
         y = self.background_rect.y - 38 - 5
@@ -110,21 +154,25 @@ class AltitudeIndicator:
         h = self.height + 38 + 10
         self.render_rect = pygame.Rect(x, y, w, h)
 
+        ### borders and digits box outline never move, composite them in one blit
+        self.static_layer = None
+        if self.layered:
+            self.static_layer = StaticLayer(self.screen_rect.size, self.draw_static_elements)
+
     @staticmethod
     def draw_altitude_number(screen: pygame.Surface, altitude: float, size: int, **kwargs) -> pygame.Rect:
         color = kwargs.get("color", (255, 255, 255))
         position = kwargs.get("position", (0, 0))
+        antialias = kwargs.get("antialias", True)
 
         altitude = np.round(altitude, -2)
         thousands_value = altitude // 1000
         houndreds_value = altitude - thousands_value * 1000
 
-        font = pygame.font.SysFont("helvetica", size)
-        thousands = font.render(f"{thousands_value:.0f}", True, color)
+        thousands = render_text(f"{thousands_value:.0f}", size, color, antialias=antialias)
         thousands_rect = thousands.get_rect()
 
-        font = pygame.font.SysFont("helvetica", int(size * 0.8))
-        houndreds = font.render(f"{houndreds_value:03.0f}", True, color)
+        houndreds = render_text(f"{houndreds_value:03.0f}", int(size * 0.8), color, antialias=antialias)
         houndreds_rect = houndreds.get_rect()
 
         thousands_rect.topleft = position
@@ -136,81 +184,78 @@ class AltitudeIndicator:
 
         return pygame.Rect(thousands_rect.x, thousands_rect.y, thousands_rect.w + houndreds_rect.w, thousands_rect.h)
 
+    @staticmethod
+    def draw_mark(
+        surface: pygame.Surface,
+        mark: float,
+        posy: float,
+        lines_length: float,
+        lines_length2: float,
+        line_width: int,
+        line_width_thick: int,
+        font_size: int,
+        font_separation: int,
+    ) -> None:
+        p1 = (0, posy)
+        mark_color = (255, 255, 255)
+        if mark <= 0:
+            mark = abs(mark)
+            mark_color = (255, 0, 0)
+        if mark % 1000 == 0:
+            p2 = (lines_length2, posy)
+            pygame.draw.line(surface, mark_color, p1, p2, width=line_width_thick)
+        else:
+            p2 = (lines_length2, posy)
+            pygame.draw.line(surface, mark_color, p1, p2, width=line_width)
+        if mark % 200 == 0:
+            num_pos = (lines_length * 1.5, posy - font_separation)
+            AltitudeIndicator.draw_altitude_number(surface, mark, font_size, color=mark_color, position=num_pos)
+
     def draw_lines(self) -> None:
+        if self.tape_strip is not None:
+            self.tape_strip.draw(self.background, self.altitude, self.vmid)
+            return
         min_altitude_mark = np.round(self.bar_min_altitude, -2)
         max_altitude_mark = np.round(self.bar_max_altitude, -2)
         marks = np.arange(min_altitude_mark, max_altitude_mark + 100, 100.0)
         for mark in quit_out_range(marks, self.bar_min_altitude, self.bar_max_altitude):
             incy = (self.altitude - mark) * self.altitude2heigth
-            p1 = (0, self.vmid + incy)
-            mark_color = (255, 255, 255)
-            if mark <= 0:
-                mark = abs(mark)
-                mark_color = (255, 0, 0)
-            if mark % 1000 == 0:
-                p2 = (self.lines_length2, self.vmid + incy)
-                pygame.draw.line(self.background, mark_color, p1, p2, width=self.line_width4)
-            else:
-                p2 = (self.lines_length2, self.vmid + incy)
-                pygame.draw.line(self.background, mark_color, p1, p2, width=self.line_width2)
-            if mark % 200 == 0:
-                num_pos = (self.lines_length * 1.5, self.vmid + incy - self.marks_font_separation)
-                self.draw_altitude_number(
-                    self.background, mark, self.marks_font_size, color=mark_color, position=num_pos
-                )
+            self.draw_mark(self.background, mark, self.vmid + incy, **self.marks_geometry)
 
     def draw_digits_display(self) -> None:
         pygame.draw.polygon(self.screen, (0, 0, 0), self.box_poly)
 
-        altitude_abs = self.altitude
         digits_color = (255, 255, 255)
         if self.altitude <= 0.0:
-            altitude_abs = abs(self.altitude)
             digits_color = (255, 0, 0)
 
-        digit2_value = get_digit(altitude_abs, 1)
-        digit3_value = get_digit(altitude_abs, 2)
-        digit4_value = get_digit(altitude_abs, 3)
-        digit5_value = get_digit(altitude_abs, 4)
+        digit3_value = self.digit3_value
+        digit4_value = self.digit4_value
+        digit5_value = self.digit5_value
 
         self.box_surface.fill((0, 0, 0))
 
-        font = pygame.font.SysFont("helvetica", self.digit_font_size1)
-
-        digit5 = font.render(f"{digit5_value:.0f}", True, digits_color)
+        digit5 = render_text(f"{digit5_value:.0f}", self.digit_font_size1, digits_color, antialias=self.antialias)
         digit5_rect = digit5.get_rect()
         digit5_rect.center = self.digit5_pos
         self.box_surface.blit(digit5, digit5_rect)
 
-        digit4 = font.render(f"{digit4_value:.0f}", True, digits_color)
+        digit4 = render_text(f"{digit4_value:.0f}", self.digit_font_size1, digits_color, antialias=self.antialias)
         digit4_rect = digit4.get_rect()
         digit4_rect.center = self.digit4_pos
         self.box_surface.blit(digit4, digit4_rect)
 
-        font = pygame.font.SysFont("helvetica", self.digit_font_size2)
-
-        digit3 = font.render(f"{digit3_value:.0f}", True, digits_color)
+        digit3 = render_text(f"{digit3_value:.0f}", self.digit_font_size2, digits_color, antialias=self.antialias)
         digit3_rect = digit3.get_rect()
         digit3_rect.center = self.digit3_pos
         self.box_surface.blit(digit3, digit3_rect)
 
-        digit12_value = digit2_value // 2 * 20
-        fract_part = np.modf(altitude_abs * 0.05)[0]
-        for num in np.arange(digit12_value - 40, digit12_value + 60, 20):
-            incy = (fract_part + (digit12_value - num) * 0.05) * 0.36
-            if num < 0:
-                num += 100
-            if num > 90:
-                num -= 100
-            digits = font.render(f"{num:02.0f}", True, digits_color)
-            digits_rect = digits.get_rect()
-            digits_rect.center = (self.digit12_pos[0], self.box_size * (0.5 + incy) - 3)
-            self.box_surface.blit(digits, digits_rect)
+        self.digit12_drums[digits_color].draw(
+            self.box_surface, self.digit12_value * 0.05 + self.fract_part, self.digit12_pos
+        )
 
         self.screen.blit(self.box_surface, self.box_surface_rect)
 
-        pygame.draw.polygon(self.screen, (255, 255, 255), self.box_poly, width=self.line_width3)
-
     def draw_command_mark(self) -> None:
         if self.bar_min_altitude < self.command < self.bar_max_altitude:
             incy = (self.altitude - self.command) * self.altitude2heigth
@@ -231,53 +276,69 @@ class AltitudeIndicator:
             size=self.command_font_size,
             position=self.command_position,
             color=self.command_mark_color,
+            antialias=self.antialias,
         )
 
-    def draw_border_lines(self):
+    def draw_border_lines(self, surface: pygame.Surface) -> None:
         # pygame.draw.line(self.screen, (255, 255, 255), self.border_line_v[0], self.border_line_v[1], width=self.line_width3)
         # pygame.draw.line(self.screen, (255, 255, 255), self.border_line_h1[0], self.border_line_h1[1], width=self.line_width3)
         # pygame.draw.line(self.screen, (255, 255, 255), self.border_line_h2[0], self.border_line_h2[1], width=self.line_width3)
         pygame.draw.line(
-            self.screen,
+            surface,
             (255, 255, 255),
             self.background_rect.topleft,
             self.background_rect.bottomleft,
             width=self.line_width3,
         )
         pygame.draw.line(
-            self.screen,
+            surface,
             (255, 255, 255),
             self.background_rect.topleft,
             self.background_rect.topright,
             width=self.line_width3,
         )
         pygame.draw.line(
-            self.screen,
+            surface,
             (255, 255, 255),
             self.background_rect.bottomleft,
             self.background_rect.bottomright,
             width=self.line_width3,
         )
 
-    def update(self, altitude: float, command: float = None):
-        # self.altitude = np.clip(altitude, 0.0, None)
-        self.altitude = altitude
+    def draw_static_elements(self, surface: pygame.Surface) -> None:
+        self.draw_border_lines(surface)
+        pygame.draw.polygon(surface, (255, 255, 255), self.box_poly, width=self.line_width3)
 
-        if command is None:
-            self.command = None
-        else:
-            # self.command = np.clip(command, 0.0, None)
-            self.command = command
+    def compute_update(self, altitude, command=None) -> dict:
+        ### works on scalars and on whole arrays of samples
+        altitude_abs = np.abs(altitude)
+        digit2_value = get_digit(altitude_abs, 1)
+        return {
+            "altitude": altitude,
+            "command": command,
+            "bar_min_altitude": altitude - self.indicator_range,
+            "bar_max_altitude": altitude + self.indicator_range,
+            "altitude_abs": altitude_abs,
+            "digit2_value": digit2_value,
+            "digit3_value": get_digit(altitude_abs, 2),
+            "digit4_value": get_digit(altitude_abs, 3),
+            "digit5_value": get_digit(altitude_abs, 4),
+            "digit12_value": digit2_value // 2 * 20,
+            "fract_part": np.modf(altitude_abs * 0.05)[0],
+        }
 
-        self.bar_min_altitude = self.altitude - self.indicator_range
-        self.bar_max_altitude = self.altitude + self.indicator_range
+    def update(self, altitude: float, command: float = None):
+        vars(self).update(self.compute_update(altitude, command))
 
     def draw(self):
         self.background.fill(self.background_color)
         self.draw_lines()
         self.screen.blit(self.background, self.background_rect)
-        self.draw_border_lines()
         self.draw_digits_display()
+        if self.static_layer is None:
+            self.draw_static_elements(self.screen)
+        else:
+            self.static_layer.draw(self.screen)
         if not self.command is None:
             self.draw_command_mark()
         return self.render_rect
@@ -8,7 +8,12 @@
 import numpy as np
 import pygame
 
-from .common import get_digit, quit_out_range
+from .assets import get_assets
+from .common import alpha_surface, get_digit, quit_out_range
+from .drum import get_drum
+from .fonts import get_font, render_text
+from .layers import StaticLayer
+from .tape import get_tape_strip
 
 
 class AltitudeIndicatorLittle:
@@ -24,8 +29,7 @@ class AltitudeIndicatorLittle:
         self.vmid = self.height / 2
         self.hmid = self.width / 2
 
-        self.background = pygame.Surface((self.width, self.height))
-        self.background = self.background.convert_alpha()
+        self.background = alpha_surface((self.width, self.height))
         self.background_rect = self.background.get_rect()
         self.background_rect.midleft = self.position
         self.background_color = pygame.Color(100, 100, 100, 200)
@@ -41,12 +45,24 @@ class AltitudeIndicatorLittle:
         self.line_width3 = int(1 + self.size // 200)
         self.line_width4 = int(1 + self.size // 100)
 
-        self.marks_font = pygame.font.SysFont("helvetica", int(self.size // 16.5))
-        self.digits_font = pygame.font.SysFont("helvetica", int(self.size // 15.0))
-        self.command_font = pygame.font.SysFont("helvetica", int(self.size // 10.5))
+        self.marks_font_size = int(self.size // 16.5)
+        self.marks_font = get_font("helvetica", self.marks_font_size)
+        self.digits_font_size = int(self.size // 15.0)
+        self.digits_font = get_font("helvetica", self.digits_font_size)
+        self.command_font_size = int(self.size // 10.5)
+        self.command_font = get_font("helvetica", self.command_font_size)
         self.command_separation = int(self.size // 100.0)
 
-        self.build_constant_elements()
+        self.tape_strips = kwargs.get("tape_strips", False)
+        self.layered = kwargs.get("layered", False)
+        ### dynamic texts (digits, command value) can be rendered without antialiasing
+        self.antialias = kwargs.get("antialias", True)
+
+        ### pre-compute all constant shapes, shared with the indicators of the same size and place
+        key = (type(self).__name__, self.screen_rect.size, self.size, self.position, self.tape_strips, self.layered)
+        vars(self).update(get_assets(key, self, self.build_constant_elements))
+        ### the digits are drawn on the box every frame, each indicator needs its own
+        self.box_surface = pygame.Surface(self.box_surface_rect.size)
 
         self.update(0.0)
 
@@ -62,8 +78,7 @@ class AltitudeIndicatorLittle:
             (self.background_rect.right - self.box_size, self.background_rect.centery + self.box_size / 2),
             (self.background_rect.right + self.box_size / 3, self.background_rect.centery + self.box_size / 2),
         ]
-        self.box_surface = pygame.Surface((self.box_size * (4 / 3), self.box_size - 8))
-        self.box_surface_rect = self.box_surface.get_rect()
+        self.box_surface_rect = pygame.Rect(0, 0, int(self.box_size * (4 / 3)), int(self.box_size - 8))
         self.box_surface_rect.midright = (self.background_rect.right + self.box_size / 3, self.background_rect.centery)
         self.digits_display_rect = pygame.draw.polygon(
             self.screen, (255, 255, 255), self.box_poly, width=self.line_width3
@@ -75,6 +90,13 @@ class AltitudeIndicatorLittle:
         self.digit2_pos = (self.box_size * 0.75, self.box_size * 0.5 - 3)
         self.digit1_pos = (self.box_size * 1.00, self.box_size * 0.5 - 3)
 
+        ### rolling units drums, white and red (below zero)
+        digits = [f"{num}" for num in range(10)]
+        self.digit1_drums = {
+            color: get_drum(digits, self.digits_font_size, color, self.box_size * 0.5)
+            for color in ((255, 255, 255), (255, 0, 0))
+        }
+
         ### command mark
         self.command_mark_color = pygame.Color("#F000FF")
         self.command_mark_original = [
@@ -98,6 +120,29 @@ class AltitudeIndicatorLittle:
         #     (self.background_rect.left - self.width / 3, self.background_rect.bottom),
         # )
 
+        ### only numbers, so that the shared tape strip keeps no reference to this indicator
+        self.marks_geometry = dict(
+            lines_length=self.lines_length,
+            lines_length2=self.lines_length2,
+            line_width=self.line_width2,
+            line_width_thick=self.line_width4,
+            font_size=self.marks_font_size,
+        )
+
+        ### pre-rendered tape strip
+        self.tape_strip = None
+        if self.tape_strips:
+            self.tape_strip = get_tape_strip(
+                (type(self).__name__, self.size),
+                self.width,
+                self.altitude2heigth,
+                2.5,
+                self.draw_mark,
+                mark_geometry=self.marks_geometry,
+                tile_height=self.height,
+                margin=(self.marks_font.get_height() + self.line_width4) / self.altitude2heigth,
+            )
+
         ### render rectangle
         x = self.background_rect.x - self.box_size * 0.33 - 5
         y = self.background_rect.y - 38 - 5
@@ -105,54 +150,73 @@ class AltitudeIndicatorLittle:
         h = self.height + 38 + 10
         self.render_rect = pygame.Rect(x, y, w, h)
 
+        ### borders and digits box outline never move, composite them in one blit
+        self.static_layer = None
+        if self.layered:
+            self.static_layer = StaticLayer(self.screen_rect.size, self.draw_static_elements)
+
+    @staticmethod
+    def draw_mark(
+        surface: pygame.Surface,
+        mark: float,
+        posy: float,
+        lines_length: float,
+        lines_length2: float,
+        line_width: int,
+        line_width_thick: int,
+        font_size: int,
+    ) -> None:
+        p1 = (0, posy)
+        mark_color = (255, 255, 255)
+        if mark <= 0:
+            mark = abs(mark)
+            mark_color = (255, 0, 0)
+        if mark % 50 == 0:
+            p2 = (lines_length2, posy)
+            pygame.draw.line(surface, mark_color, p1, p2, width=line_width_thick)
+        elif mark % 5 == 0:
+            p2 = (lines_length2, posy)
+            pygame.draw.line(surface, mark_color, p1, p2, width=line_width)
+            altitude_num = render_text(f"{mark:.0f}", font_size, mark_color)
+            altitude_num_rect = altitude_num.get_rect()
+            altitude_num_rect.midleft = (lines_length2 * 1.2, posy)
+            surface.blit(altitude_num, altitude_num_rect)
+        else:
+            p2 = (lines_length, posy)
+            pygame.draw.line(surface, mark_color, p1, p2, width=line_width)
+
     def draw_lines(self) -> None:
+        if self.tape_strip is not None:
+            self.tape_strip.draw(self.background, self.altitude, self.vmid)
+            return
         min_altitude_mark = self.bar_min_altitude//2.5*2.5
         max_altitude_mark = self.bar_max_altitude//2.5*2.5
         marks = np.arange(min_altitude_mark, max_altitude_mark + 2.5, 2.5)
         for mark in quit_out_range(marks, self.bar_min_altitude, self.bar_max_altitude):
             incy = (self.altitude - mark) * self.altitude2heigth
-            p1 = (0, self.vmid + incy)
-            mark_color = (255, 255, 255)
-            if mark <= 0:
-                mark = abs(mark)
-                mark_color = (255, 0, 0)
-            if mark % 50 == 0:
-                p2 = (self.lines_length2, self.vmid + incy)
-                pygame.draw.line(self.background, mark_color, p1, p2, width=self.line_width4)
-            elif mark % 5 == 0:
-                p2 = (self.lines_length2, self.vmid + incy)
-                pygame.draw.line(self.background, mark_color, p1, p2, width=self.line_width2)
-                altitude_num = self.marks_font.render(f"{mark:.0f}", True, mark_color)
-                altitude_num_rect = altitude_num.get_rect()
-                altitude_num_rect.midleft = (self.lines_length2 * 1.2, self.vmid + incy)
-                self.background.blit(altitude_num, altitude_num_rect)
-            else:
-                p2 = (self.lines_length, self.vmid + incy)
-                pygame.draw.line(self.background, mark_color, p1, p2, width=self.line_width2)
+            self.draw_mark(self.background, mark, self.vmid + incy, **self.marks_geometry)
 
     def draw_digits_display(self) -> None:
         pygame.draw.polygon(self.screen, (0, 0, 0), self.box_poly)
 
-        altitude_abs = self.altitude
         digits_color = (255, 255, 255)
         if self.altitude <= 0.0:
-            altitude_abs = abs(self.altitude)
             digits_color = (255, 0, 0)
 
-        digit1_value = get_digit(altitude_abs, 0)
-        digit2_value = get_digit(altitude_abs, 1)
-        digit3_value = get_digit(altitude_abs, 2)
-        digit4_value = get_digit(altitude_abs, 3)
+        digit1_value = self.digit1_value
+        digit2_value = self.digit2_value
+        digit3_value = self.digit3_value
+        digit4_value = self.digit4_value
 
         self.box_surface.fill((0, 0, 0))
         
-        fract_part = np.modf(self.altitude)[0]
+        fract_part = self.fract_part
 
-        if altitude_abs > 999.5:
+        if self.altitude_abs > 999.5:
             if digit3_value == 9 and digit2_value == 9 and digit1_value == 9 and fract_part > 0.5:
                 digit4_value += 1
                 digit4_value %= 10
-            digit4 = self.digits_font.render(f"{digit4_value:.0f}", True, digits_color)
+            digit4 = render_text(f"{digit4_value:.0f}", self.digits_font_size, digits_color, antialias=self.antialias)
             digit4_rect = digit4.get_rect()
             digit4_rect.center = self.digit4_pos
             self.box_surface.blit(digit4, digit4_rect)
@@ -160,7 +224,7 @@ class AltitudeIndicatorLittle:
         if digit2_value == 9 and digit1_value == 9 and fract_part > 0.5:
             digit3_value += 1
             digit3_value %= 10
-        digit3 = self.digits_font.render(f"{digit3_value:.0f}", True, digits_color)
+        digit3 = render_text(f"{digit3_value:.0f}", self.digits_font_size, digits_color, antialias=self.antialias)
         digit3_rect = digit3.get_rect()
         digit3_rect.center = self.digit3_pos
         self.box_surface.blit(digit3, digit3_rect)
@@ -169,26 +233,18 @@ class AltitudeIndicatorLittle:
         if digit1_value == 9 and fract_part > 0.5:
             digit2_value += 1
             digit2_value %= 10
-        digit2 = self.digits_font.render(f"{digit2_value:.0f}", True, digits_color)
+        digit2 = render_text(f"{digit2_value:.0f}", self.digits_font_size, digits_color, antialias=self.antialias)
         digit2_rect = digit2.get_rect()
         digit2_rect.center = self.digit2_pos
         self.box_surface.blit(digit2, digit2_rect)
 
-        rolling_nums = np.arange(digit1_value - 2, digit1_value + 3, 1)
-        for num in rolling_nums:
-            incy = (fract_part + digit1_value - num) * 0.5
-            if self.altitude < 0:
-                incy = (-fract_part + digit1_value - num) * 0.5
-            num %= 10
-            digit1 = self.digits_font.render(f"{num:.0f}", True, digits_color)
-            digit1_rect = digit1.get_rect()
-            digit1_rect.center = (self.digit1_pos[0], self.box_size * (0.5 + incy) - 3)
-            self.box_surface.blit(digit1, digit1_rect)
+        position = digit1_value + fract_part
+        if self.altitude < 0:
+            position = digit1_value - fract_part
+        self.digit1_drums[digits_color].draw(self.box_surface, position, self.digit1_pos)
 
         self.screen.blit(self.box_surface, self.box_surface_rect)
 
-        pygame.draw.polygon(self.screen, (255, 255, 255), self.box_poly, width=self.line_width3)
-
     def draw_command_mark(self) -> None:
         if self.bar_min_altitude < self.command < self.bar_max_altitude:
             incy = (self.altitude - self.command) * self.altitude2heigth
@@ -203,57 +259,72 @@ class AltitudeIndicatorLittle:
             ]
             pygame.draw.polygon(self.screen, self.command_mark_color, command_mark, width=self.line_width3)
 
-        command_value = self.command_font.render(f"{self.command:.0f}", True, self.command_mark_color)
+        command_value = render_text(
+            f"{self.command:.0f}", self.command_font_size, self.command_mark_color, antialias=self.antialias
+        )
         command_value_rect = command_value.get_rect()
         command_value_rect.midbottom = self.background_rect.midtop
         command_value_rect.move_ip(0, -self.command_separation)
         self.screen.blit(command_value, command_value_rect)
 
-    def draw_border_lines(self):
+    def draw_border_lines(self, surface: pygame.Surface) -> None:
         # pygame.draw.line(self.screen, (255, 255, 255), self.border_line_v[0], self.border_line_v[1], width=self.line_width3)
         # pygame.draw.line(self.screen, (255, 255, 255), self.border_line_h1[0], self.border_line_h1[1], width=self.line_width3)
         # pygame.draw.line(self.screen, (255, 255, 255), self.border_line_h2[0], self.border_line_h2[1], width=self.line_width3)
         pygame.draw.line(
-            self.screen,
+            surface,
             (255, 255, 255),
             self.background_rect.topleft,
             self.background_rect.bottomleft,
             width=self.line_width3,
         )
         pygame.draw.line(
-            self.screen,
+            surface,
             (255, 255, 255),
             self.background_rect.topleft,
             self.background_rect.topright,
             width=self.line_width3,
         )
         pygame.draw.line(
-            self.screen,
+            surface,
             (255, 255, 255),
             self.background_rect.bottomleft,
             self.background_rect.bottomright,
             width=self.line_width3,
         )
 
-    def update(self, altitude: float, command: float = None):
-        # self.altitude = np.clip(altitude, 0.0, None)
-        self.altitude = altitude
+    def draw_static_elements(self, surface: pygame.Surface) -> None:
+        self.draw_border_lines(surface)
+        pygame.draw.polygon(surface, (255, 255, 255), self.box_poly, width=self.line_width3)
+
+    def compute_update(self, altitude, command=None) -> dict:
+        ### works on scalars and on whole arrays of samples
+        altitude_abs = np.abs(altitude)
+        return {
+            "altitude": altitude,
+            "command": command,
+            "bar_min_altitude": altitude - self.indicator_range,
+            "bar_max_altitude": altitude + self.indicator_range,
+            "altitude_abs": altitude_abs,
+            "digit1_value": get_digit(altitude_abs, 0),
+            "digit2_value": get_digit(altitude_abs, 1),
+            "digit3_value": get_digit(altitude_abs, 2),
+            "digit4_value": get_digit(altitude_abs, 3),
+            "fract_part": np.modf(altitude)[0],
+        }
 
-        if command is None:
-            self.command = None
-        else:
-            # self.command = np.clip(command, 0.0, None)
-            self.command = command
-
-        self.bar_min_altitude = self.altitude - self.indicator_range
-        self.bar_max_altitude = self.altitude + self.indicator_range
+    def update(self, altitude: float, command: float = None):
+        vars(self).update(self.compute_update(altitude, command))
 
     def draw(self):
         self.background.fill(self.background_color)
         self.draw_lines()
         self.screen.blit(self.background, self.background_rect)
-        self.draw_border_lines()
         self.draw_digits_display()
+        if self.static_layer is None:
+            self.draw_static_elements(self.screen)
+        else:
+            self.static_layer.draw(self.screen)
         if not self.command is None:
             self.draw_command_mark()
         return self.render_rect
@@ -0,0 +1,37 @@
+"""
+ Copyright (c) 2022 Pablo Ramirez Escudero
+
+ This software is released under the MIT License.
+ https://opensource.org/licenses/MIT
+"""
+
+from .cache import LRUCache
+
+### process-wide instrument assets (labels, polygons, textures, static layers...) keyed by
+### (class name, screen size, size, position or variant...), shared read-only by every display
+assets = LRUCache(capacity=64)
+
+
+def get_assets(key: tuple, instrument, build) -> dict:
+    """
+    Attributes set by `build()` on the first `instrument` of `key`, to be set on the next ones with
+    `vars(instrument).update(...)` instead of building them again.
+
+    They are shared by every instrument of the same key, so `build()` must only set attributes that are never
+    changed while drawing: surfaces drawn every frame belong to each instrument.
+    """
+
+    def build_assets() -> dict:
+        names = set(vars(instrument))
+        build()
+        return {name: value for name, value in vars(instrument).items() if name not in names}
+
+    return assets.get(key, build_assets)
+
+
+def set_assets_capacity(capacity: int) -> None:
+    assets.set_capacity(capacity)
+
+
+def assets_stats() -> dict:
+    return assets.stats()
@@ -1,7 +1,14 @@
 import numpy as np
 import pygame
 
-from .common import quit_out_range
+from .assets import get_assets
+from .cache import LRUCache
+from .common import quit_out_range, surface_bytes
+from .fonts import get_font, render_text
+from .layers import StaticLayer
+
+### rotated pitch labels shared by every horizon, keyed by (font size, label, roll step, quantized roll)
+rotated_labels_cache = LRUCache(capacity=2048)
 
 
 class ArtificalHorizon:
@@ -38,10 +45,37 @@ class ArtificalHorizon:
         self.line_width3 = int(1 + self.size // 200)
         self.line_width4 = int(1 + self.size // 100)
 
-        self.marks_font = pygame.font.SysFont("helvetica", int(self.size // 16.5))
-
-        ### pre-compute all constant shapes
-        self.build_constant_elements()
+        self.marks_font_size = int(self.size // 16.5)
+        self.marks_font = get_font("helvetica", self.marks_font_size)
+
+        ### pitch labels are rotated by the roll quantized to this step (degrees), 0 rotates them every frame
+        self.label_roll_step = kwargs.get("label_roll_step", 0.5)
+        ### the 2.5 deg ladder lines can be left out (e.g. by the quality governor)
+        self.fine_lines = kwargs.get("fine_lines", True)
+
+        ### "polygon" rasterizes sky, ground and ladder every frame, "texture" rotates a view cut from pre-rendered ladder
+        self.horizon_engine = kwargs.get("horizon_engine", "polygon")
+        if self.horizon_engine not in ("polygon", "texture"):
+            raise ValueError(f"unknown horizon engine: {self.horizon_engine}")
+        ### rotated views of the texture engine are cached by roll quantized to this step (degrees), 0 disables it
+        self.horizon_roll_step = kwargs.get("horizon_roll_step", 0.0)
+        ### each view is cropped to the screen, the cache is also bounded in bytes (32 MB by default)
+        self.horizon_views = LRUCache(
+            capacity=kwargs.get("horizon_cache_size", 8),
+            weigh=surface_bytes,
+            max_weight=kwargs.get("horizon_cache_bytes", 32 * 2**20),
+        )
+        ### fixed roll scale and reference marks are pre-rendered in a static layer
+        self.layered = kwargs.get("layered", False)
+
+        ### pre-compute all constant shapes, shared with the horizons of the same size
+        key = (type(self).__name__, self.screen_rect.size, self.size, self.angle_range, self.horizon_engine, self.layered)
+        vars(self).update(get_assets(key, self, self.build_constant_elements))
+        if self.horizon_engine == "texture":
+            ### the view is redrawn every frame, each horizon needs its own
+            self.view = pygame.Surface((self.view_size, self.view_size))
+        if kwargs.get("warm_up_labels", False):
+            self.warm_up_labels()
 
         ### initialize
         self.update(0.0, 0.0)
@@ -50,7 +84,19 @@ class ArtificalHorizon:
         ### render pitch values text and store them
         self.pitch_values_txt = {}
         for ang in np.arange(10, 80 + 10, 10):
-            self.pitch_values_txt[ang] = self.marks_font.render(f"{ang:.0f}", True, (255, 255, 255))
+            self.pitch_values_txt[ang] = render_text(f"{ang:.0f}", self.marks_font_size, (255, 255, 255))
+
+        ### pitch ladder lines: angle, half length and whether the line carries pitch values
+        self.ladder_angles = np.concatenate((self.lines_10deg, self.lines_05deg, self.lines_025deg))
+        self.ladder_radius = np.concatenate(
+            (
+                np.full(len(self.lines_10deg), self.lines_size * 0.5),
+                np.full(len(self.lines_05deg), self.lines_size * 0.25),
+                np.full(len(self.lines_025deg), self.lines_size * 0.125),
+            )
+        )
+        self.ladder_labeled = np.arange(len(self.ladder_angles)) < len(self.lines_10deg)
+        self.ladder_fine = np.arange(len(self.ladder_angles)) >= len(self.lines_10deg) + len(self.lines_05deg)
 
         ### horizontal reference marks
         ref_size = self.size / 100
@@ -115,6 +161,63 @@ class ArtificalHorizon:
             )
             self.roll_big_marks_lines.append((p1, p2))
 
+        self.static_layer = None
+        if self.layered:
+            self.static_layer = StaticLayer(self.screen_rect.size, self.draw_static_elements)
+
+        if self.horizon_engine == "texture":
+            self.build_horizon_texture()
+
+    def build_horizon_texture(self) -> None:
+        ### square view, once rotated by any roll it still covers the whole screen
+        self.view_size = int(np.ceil(self.screen_radius)) + 2
+
+        ### unrotated ladder, pitch +90 deg on top, each line with its labels inside its own rect
+        mark_radius = self.lines_size * 0.02
+        self.ladder_padding = int(np.ceil(max(self.marks_font.get_height(), mark_radius, self.line_width2)))
+        height = int(np.ceil(180.0 * self.angle2height)) + 2 * self.ladder_padding
+        self.ladder_texture = pygame.Surface((self.view_size, height), pygame.SRCALPHA)
+        centerx = self.view_size / 2
+        self.texture_angles = np.concatenate((self.ladder_angles, self.marks_90deg))
+        self.texture_rects = []
+        for ang, radius, labeled in zip(self.ladder_angles, self.ladder_radius, self.ladder_labeled):
+            posy = self.ladder_padding + (90.0 - ang) * self.angle2height
+            rect = pygame.draw.line(
+                self.ladder_texture, (255, 255, 255), (centerx - radius, posy), (centerx + radius, posy),
+                width=self.line_width2,
+            )
+            if labeled:
+                ang_num = self.pitch_values_txt[int(abs(ang))]
+                for posx in (centerx - 1.2 * radius, centerx + 1.2 * radius):
+                    rect.union_ip(self.ladder_texture.blit(ang_num, ang_num.get_rect(center=(posx, posy))))
+            self.texture_rects.append(rect)
+        for ang in self.marks_90deg:
+            posy = self.ladder_padding + (90.0 - ang) * self.angle2height
+            rect = pygame.draw.circle(self.ladder_texture, (255, 255, 255), (centerx, posy), mark_radius)
+            self.texture_rects.append(rect)
+
+    def get_pitch_label(self, ang: float, roll: float) -> pygame.Surface:
+        label = int(abs(ang))
+        if not self.label_roll_step:
+            return pygame.transform.rotate(self.pitch_values_txt[label], roll)
+        roll_index = int(round(roll / self.label_roll_step))
+        key = (self.marks_font_size, label, self.label_roll_step, roll_index)
+        return rotated_labels_cache.get(
+            key, lambda: pygame.transform.rotate(self.pitch_values_txt[label], roll_index * self.label_roll_step)
+        )
+
+    def warm_up_labels(self) -> None:
+        ### pre-render every label at every quantized roll, so steady-state frames never rotate a surface
+        if not self.label_roll_step:
+            return
+        rolls = np.arange(-180.0, 180.0 + self.label_roll_step, self.label_roll_step)
+        labels_count = len(rolls) * len(self.pitch_values_txt)
+        if rotated_labels_cache.capacity < len(rotated_labels_cache) + labels_count:
+            rotated_labels_cache.set_capacity(len(rotated_labels_cache) + labels_count)
+        for roll in rolls:
+            for label in self.pitch_values_txt:
+                self.get_pitch_label(label, roll)
+
     def draw_aux_axis(self) -> None:
         fixed_lines_color = pygame.Color(255, 0, 0)
         frame_points = [
@@ -172,83 +275,107 @@ class ArtificalHorizon:
         pygame.draw.polygon(self.screen, self.gnd_color, [p1a, p2a, p2b, p1b])
         pygame.draw.line(self.screen, (255, 255, 255), p1a, p1b, width=self.line_width2)
 
+    def get_horizon_view(self, roll: float, incy: float) -> pygame.Surface:
+        pitch = incy / self.angle2height
+        max_ang = pitch + self.render_angle
+        min_ang = pitch - self.render_angle
+        horizon_posy = self.view_size / 2 + incy
+
+        self.view.fill(self.sky_color)
+        self.view.fill(self.gnd_color, (0, round(horizon_posy), self.view_size, self.view_size))
+        pygame.draw.line(self.view, (255, 255, 255), (0, horizon_posy), (self.view_size, horizon_posy), self.line_width2)
+
+        ### copy the ladder lines inside the render band from the texture
+        offset = round(horizon_posy - self.ladder_padding - 90.0 * self.angle2height)
+        visible = (self.texture_angles >= min_ang) & (self.texture_angles <= max_ang)
+        if not self.fine_lines:
+            visible[: len(self.ladder_fine)] &= ~self.ladder_fine
+        for index in np.flatnonzero(visible).tolist():
+            rect = self.texture_rects[index]
+            self.view.blit(self.ladder_texture, (rect.x, rect.y + offset), rect)
+
+        return pygame.transform.rotate(self.view, roll)
+
+    def draw_horizon_texture(self) -> None:
+        if self.horizon_roll_step:
+            ### quantize roll and pitch offset (pixels) so steady flight reuses the rotated views
+            roll_index = int(round(self.roll / self.horizon_roll_step))
+            incy = int(round(self.incy))
+            view = self.horizon_views.get(
+                (roll_index, incy), lambda: self.get_screen_view(roll_index * self.horizon_roll_step, incy)
+            )
+            self.screen.blit(view, (0, 0))
+        else:
+            view = self.get_horizon_view(self.roll, self.incy)
+            self.screen.blit(view, view.get_rect(center=self.screen_rect.center))
+
+    def get_screen_view(self, roll: float, incy: float) -> pygame.Surface:
+        """Rotated view cropped to the part that lands on the screen, the rest is never shown."""
+        view = self.get_horizon_view(roll, incy)
+        left, top = view.get_rect(center=self.screen_rect.center).topleft
+        return view.subsurface(pygame.Rect((-left, -top), self.screen_rect.size)).copy()
+
     def draw_white_lines(self) -> None:
         max_ang = self.pitch + self.render_angle
         min_ang = self.pitch - self.render_angle
 
-        ### PLOT MAIN LINES (10 DEG) AND PITCH VALUES ###
-        line_radius = self.lines_size * 0.5
-        lsin = line_radius * self.sin_roll
-        lcos = line_radius * self.cos_roll
-        tsin = line_radius * self.sin_roll * 1.2
-        tcos = line_radius * self.cos_roll * 1.2
-        for ang in quit_out_range(self.lines_10deg, min_ang, max_ang):
-            dist = self.angle2height * ang
-            dsin = dist * self.sin_roll
-            dcos = dist * self.cos_roll
-            line_center = (self.pitch_center[0] - dsin, self.pitch_center[1] - dcos)
-            line_p1 = (line_center[0] - lcos, line_center[1] + lsin)
-            line_p2 = (line_center[0] + lcos, line_center[1] - lsin)
-            pygame.draw.line(self.screen, (255, 255, 255), line_p1, line_p2, width=self.line_width2)
-            ang_num = self.pitch_values_txt[abs(ang)]
-            ang_num = pygame.transform.rotate(ang_num, self.roll)
+        ### geometry of every visible ladder line in one batch
+        visible = (self.ladder_angles >= min_ang) & (self.ladder_angles <= max_ang)
+        if not self.fine_lines:
+            visible &= ~self.ladder_fine
+        angles = self.ladder_angles[visible]
+        dist = self.angle2height * angles
+        centers_x = self.pitch_center[0] - dist * self.sin_roll
+        centers_y = self.pitch_center[1] - dist * self.cos_roll
+        lsin = self.ladder_radius[visible] * self.sin_roll
+        lcos = self.ladder_radius[visible] * self.cos_roll
+
+        ### PLOT LADDER LINES (10, 5 AND 2.5 DEG) ###
+        lines = np.column_stack((centers_x - lcos, centers_y + lsin, centers_x + lcos, centers_y - lsin))
+        for x1, y1, x2, y2 in lines.tolist():
+            pygame.draw.line(self.screen, (255, 255, 255), (x1, y1), (x2, y2), width=self.line_width2)
+
+        ### PLOT PITCH VALUES AT BOTH SIDES OF 10 DEG LINES ###
+        labeled = self.ladder_labeled[visible]
+        tsin = lsin[labeled] * 1.2
+        tcos = lcos[labeled] * 1.2
+        centers_x = centers_x[labeled]
+        centers_y = centers_y[labeled]
+        labels = np.column_stack((angles[labeled], centers_x - tcos, centers_y + tsin, centers_x + tcos, centers_y - tsin))
+        for ang, x1, y1, x2, y2 in labels.tolist():
+            ang_num = self.get_pitch_label(ang, self.roll)
             # ang_num = pygame.transform.rotozoom(ang_num, self.roll, 1)
             ang_num_rect = ang_num.get_rect()
-            line_p1 = (line_center[0] - tcos, line_center[1] + tsin)
-            line_p2 = (line_center[0] + tcos, line_center[1] - tsin)
-            ang_num_rect.center = line_p1
+            ang_num_rect.center = (x1, y1)
             self.screen.blit(ang_num, ang_num_rect)
-            ang_num_rect.center = line_p2
+            ang_num_rect.center = (x2, y2)
             self.screen.blit(ang_num, ang_num_rect)
 
-        ### PLOT SECOND LINES (5 DEG) ###
-        line_radius = self.lines_size * 0.25
-        lsin = line_radius * self.sin_roll
-        lcos = line_radius * self.cos_roll
-        for ang in quit_out_range(self.lines_05deg, min_ang, max_ang):
-            dist = self.angle2height * ang
-            dsin = dist * self.sin_roll
-            dcos = dist * self.cos_roll
-            line_center = (self.pitch_center[0] - dsin, self.pitch_center[1] - dcos)
-            line_p1 = (line_center[0] - lcos, line_center[1] + lsin)
-            line_p2 = (line_center[0] + lcos, line_center[1] - lsin)
-            pygame.draw.line(self.screen, (255, 255, 255), line_p1, line_p2, width=self.line_width2)
-
-        ### PLOT THIRD LINES (2.5 DEG) ###
-        line_radius = self.lines_size * 0.125
-        lsin = line_radius * self.sin_roll
-        lcos = line_radius * self.cos_roll
-        for ang in quit_out_range(self.lines_025deg, min_ang, max_ang):
-            dist = self.angle2height * ang
-            dsin = dist * self.sin_roll
-            dcos = dist * self.cos_roll
-            line_center = (self.pitch_center[0] - dsin, self.pitch_center[1] - dcos)
-            line_p1 = (line_center[0] - lcos, line_center[1] + lsin)
-            line_p2 = (line_center[0] + lcos, line_center[1] - lsin)
-            pygame.draw.line(self.screen, (255, 255, 255), line_p1, line_p2, width=self.line_width2)
-
         ### PLOT 90 DEG MARKS ###
         mark_radius = self.lines_size * 0.02
         for ang in quit_out_range(self.marks_90deg, min_ang, max_ang):
             dist = self.angle2height * ang
-            dsin = dist * self.sin_roll
-            dcos = dist * self.cos_roll
-            line_center = (self.pitch_center[0] - dsin, self.pitch_center[1] - dcos)
+            line_center = (self.pitch_center[0] - dist * self.sin_roll, self.pitch_center[1] - dist * self.cos_roll)
             pygame.draw.circle(self.screen, (255, 255, 255), line_center, mark_radius)
 
     def draw_roll_marks(self) -> None:
-        pygame.draw.polygon(self.screen, (255, 255, 255), self.roll_pointer_poly)
+        self.draw_roll_scale(self.screen)
+        self.draw_roll_pointer()
+
+    def draw_roll_scale(self, surface: pygame.Surface) -> None:
+        pygame.draw.polygon(surface, (255, 255, 255), self.roll_pointer_poly)
 
         for line in self.roll_small_marks_lines:
-            pygame.draw.line(self.screen, (255, 255, 255), line[0], line[1], width=self.line_width3)
+            pygame.draw.line(surface, (255, 255, 255), line[0], line[1], width=self.line_width3)
 
         for line in self.roll_big_marks_lines:
-            pygame.draw.line(self.screen, (255, 255, 255), line[0], line[1], width=self.line_width3)
+            pygame.draw.line(surface, (255, 255, 255), line[0], line[1], width=self.line_width3)
 
         pygame.draw.arc(
-            self.screen, (255, 255, 255), self.roll_arc_rect, np.deg2rad(30), np.deg2rad(150), width=self.line_width3
+            surface, (255, 255, 255), self.roll_arc_rect, np.deg2rad(30), np.deg2rad(150), width=self.line_width3
         )
 
+    def draw_roll_pointer(self) -> None:
         h1sin = self.roll_arc_radius * self.sin_roll
         h1cos = self.roll_arc_radius * self.cos_roll
         h2sin = (self.roll_arc_radius - self.roll_pointer_height) * self.sin_roll
@@ -261,30 +388,53 @@ class ArtificalHorizon:
         p2b = (p2[0] + wcos, p2[1] - wsin)
         pygame.draw.polygon(self.screen, (255, 255, 255), [p1, p2a, p2b])
 
-    def draw_reference_marks(self) -> None:
-        pygame.draw.polygon(self.screen, (0, 0, 0), self.reference_central_poly)
-        pygame.draw.polygon(self.screen, (255, 255, 255), self.reference_central_poly, width=self.line_width2)
-        pygame.draw.polygon(self.screen, (0, 0, 0), self.reference_rigth_poly)
-        pygame.draw.polygon(self.screen, (255, 255, 255), self.reference_rigth_poly, width=self.line_width2)
-        pygame.draw.polygon(self.screen, (0, 0, 0), self.reference_left_poly)
-        pygame.draw.polygon(self.screen, (255, 255, 255), self.reference_left_poly, width=self.line_width2)
+    def draw_reference_marks(self, surface: pygame.Surface) -> None:
+        pygame.draw.polygon(surface, (0, 0, 0), self.reference_central_poly)
+        pygame.draw.polygon(surface, (255, 255, 255), self.reference_central_poly, width=self.line_width2)
+        pygame.draw.polygon(surface, (0, 0, 0), self.reference_rigth_poly)
+        pygame.draw.polygon(surface, (255, 255, 255), self.reference_rigth_poly, width=self.line_width2)
+        pygame.draw.polygon(surface, (0, 0, 0), self.reference_left_poly)
+        pygame.draw.polygon(surface, (255, 255, 255), self.reference_left_poly, width=self.line_width2)
+
+    def draw_static_elements(self, surface: pygame.Surface) -> None:
+        ### the roll pointer is white like the scale, so drawing the scale over it gives the same pixels
+        self.draw_roll_scale(surface)
+        self.draw_reference_marks(surface)
+
+    def compute_update(self, roll, pitch) -> dict:
+        ### works on scalars and on whole arrays of samples
+        roll = np.clip(roll, -180.0, +180.0)
+        pitch = np.clip(pitch, -90.0, +90.0)
+        sin_roll = np.sin(np.deg2rad(roll))
+        cos_roll = np.cos(np.deg2rad(roll))
+        incy = self.angle2height * pitch
+        return {
+            "roll": roll,
+            "pitch": pitch,
+            "sin_roll": sin_roll,
+            "cos_roll": cos_roll,
+            "rsin_roll": self.screen_radius * sin_roll,
+            "rcos_roll": self.screen_radius * cos_roll,
+            "incy": incy,
+            "pitch_center": (
+                self.screen_rect.center[0] + incy * sin_roll,
+                self.screen_rect.center[1] + incy * cos_roll,
+            ),
+        }
 
     def update(self, roll: float, pitch: float) -> None:
-        self.roll = np.clip(roll, -180.0, +180.0)
-        self.pitch = np.clip(pitch, -90.0, +90.0)
-        self.sin_roll = np.sin(np.deg2rad(self.roll))
-        self.cos_roll = np.cos(np.deg2rad(self.roll))
-        self.rsin_roll = self.screen_radius * self.sin_roll
-        self.rcos_roll = self.screen_radius * self.cos_roll
-        self.incy = self.angle2height * self.pitch
-        self.pitch_center = (
-            self.screen_rect.center[0] + self.incy * self.sin_roll,
-            self.screen_rect.center[1] + self.incy * self.cos_roll,
-        )
+        vars(self).update(self.compute_update(roll, pitch))
 
     def draw(self) -> pygame.Rect:
-        self.draw_background()
-        self.draw_white_lines()
-        self.draw_roll_marks()
-        self.draw_reference_marks()
+        if self.horizon_engine == "texture":
+            self.draw_horizon_texture()
+        else:
+            self.draw_background()
+            self.draw_white_lines()
+        if self.static_layer is None:
+            self.draw_roll_marks()
+            self.draw_reference_marks(self.screen)
+        else:
+            self.draw_roll_pointer()
+            self.static_layer.draw(self.screen)
         return self.frame_rect
@@ -0,0 +1,58 @@
+"""
+ Copyright (c) 2022 Pablo Ramirez Escudero
+
+ This software is released under the MIT License.
+ https://opensource.org/licenses/MIT
+"""
+
+import numpy as np
+
+from .pfd import PrimaryFlightDisplay
+from .series import AircraftStateSeries, get_frames_count
+
+
+def iter_frames(pfd: PrimaryFlightDisplay, columns: dict, times: np.ndarray = None, out: np.ndarray = None):
+    """
+    Render one frame per row of `columns` (an AircraftStateSeries or a mapping of AircraftState field name
+    to array) and yield them as (height, width, 3) uint8 RGB arrays.
+
+    The same output buffer is yielded every time, copy it if a frame must outlive the next iteration.
+    If `out` is given with shape (frames, height, width, 3), e.g. a .npy memmap, each frame is written
+    to `out[k]` and that slice is yielded instead.
+    """
+    series = columns if isinstance(columns, AircraftStateSeries) else AircraftStateSeries(columns)
+    frame = None
+    if out is None:
+        frame = np.empty((pfd.resolution[1], pfd.resolution[0], 3), dtype=np.uint8)
+
+    for k in range(len(series)):
+        time = None if times is None else float(times[k])
+        pfd.update_from_series(series, k, time)
+        pfd.draw()
+        if out is not None:
+            frame = out[k]
+        pfd.copy_frame(frame)
+        yield frame
+
+
+def write_frames(pfd: PrimaryFlightDisplay, columns: dict, output, times: np.ndarray = None) -> int:
+    """
+    Render `columns` and write raw RGB24 frames to `output`, which can be a binary file object (e.g. the stdin
+    pipe of `ffmpeg -f rawvideo -pix_fmt rgb24 -s WxH -i -`) or a path to a .npy file, created as a memmap
+    of shape (frames, height, width, 3). Returns the number of frames written.
+    """
+    if isinstance(output, str):
+        frames = len(columns) if isinstance(columns, AircraftStateSeries) else get_frames_count(columns)
+        shape = (frames, pfd.resolution[1], pfd.resolution[0], 3)
+        out = np.lib.format.open_memmap(output, mode="w+", dtype=np.uint8, shape=shape)
+        for _ in iter_frames(pfd, columns, times, out=out):
+            pass
+        out.flush()
+        del out
+        return frames
+
+    count = 0
+    for frame in iter_frames(pfd, columns, times):
+        output.write(frame.data)
+        count += 1
+    return count
@@ -0,0 +1,276 @@
+"""
+ Copyright (c) 2022 Pablo Ramirez Escudero
+
+ This software is released under the MIT License.
+ https://opensource.org/licenses/MIT
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pygame
+
+from .pfd import PrimaryFlightDisplay
+from .series import AircraftStateSeries
+
+### update arguments of each instrument, in call order
+UPDATE_ARGS = {
+    "artifical_horizon": ("roll", "pitch"),
+    "airspeed_indicator": ("airspeed", "airspeed_cmd"),
+    "altitude_indicator": ("altitude", "altitude_cmd"),
+    "vspeed_indicator": ("vspeed",),
+    "heading_indicator": ("heading", "course", "heading_cmd"),
+}
+
+TARGETS = tuple(UPDATE_ARGS) + ("pfd",)
+PROFILES = ("steady", "cruise", "maneuver")
+VARIANTS = ("standard", "little")
+RESOLUTIONS = ((800, 480), (1000, 800), (1920, 1080))
+
+### flight envelope of each variant: airspeed (kt), altitude (ft) and vspeed (ft/min) scales
+ENVELOPES = {
+    "standard": {"airspeed": 250.0, "altitude": 38000.0, "vspeed": 6000.0},
+    "little": {"airspeed": 25.0, "altitude": 100.0, "vspeed": 100.0},
+}
+
+
+def get_profile(name: str, frames: int, variant: str = "standard", fps: float = 60.0) -> AircraftStateSeries:
+    """Standard flight profile sampled at `fps`, as an AircraftStateSeries of `frames` rows."""
+    airspeed, altitude, vspeed = (ENVELOPES[variant][key] for key in ("airspeed", "altitude", "vspeed"))
+    t = np.arange(frames) / fps
+    zeros = np.zeros(frames)
+    if name == "steady":
+        ### constant state, best case for every cache
+        return AircraftStateSeries(
+            {
+                "roll": zeros,
+                "pitch": zeros,
+                "airspeed": zeros + airspeed,
+                "airspeed_cmd": zeros + airspeed,
+                "altitude": zeros + altitude,
+                "altitude_cmd": zeros + altitude,
+                "vspeed": zeros,
+                "heading": zeros + 20.0,
+                "heading_cmd": zeros + 20.0,
+                "course": zeros + 20.0,
+            }
+        )
+    if name == "cruise":
+        ### slow oscillations, like example.py
+        w1, w2, roll, pitch, heading = 2 * np.pi / 90, 2 * np.pi / 60, 60.0, 25.0, 20.0
+    elif name == "maneuver":
+        ### fast attitude changes over the whole range, every tape scrolling
+        w1, w2, roll, pitch, heading = 2 * np.pi / 9, 2 * np.pi / 6, 170.0, 85.0, 200.0
+    else:
+        raise ValueError(f"unknown flight profile: {name}")
+    return AircraftStateSeries(
+        {
+            "roll": roll * np.sin(w2 * t),
+            "pitch": pitch * np.sin(w1 * t),
+            "airspeed": airspeed * (1.0 + 0.2 * np.cos(w1 * t)),
+            "airspeed_cmd": zeros + airspeed,
+            "altitude": altitude - vspeed / 60 / w1 * np.cos(w1 * t),
+            "altitude_cmd": zeros + altitude,
+            "vspeed": vspeed * np.sin(w1 * t),
+            "heading": heading * np.sin(w2 * t),
+            "heading_cmd": zeros + 20.0,
+            "course": heading * np.sin(w2 * t) * np.cos(w1 * t),
+        }
+    )
+
+
+def get_stats(samples: list) -> dict:
+    samples = np.asarray(samples) * 1e3
+    return {
+        "mean_ms": float(np.mean(samples)),
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "max_ms": float(np.max(samples)),
+    }
+
+
+def get_steps(pfd: PrimaryFlightDisplay, target: str, series: AircraftStateSeries) -> tuple:
+    """Update and draw callables of `target` for the frame `k` of `series`."""
+    if target == "pfd":
+        return (lambda k: pfd.update(series.state(k))), pfd.draw
+    instrument = getattr(pfd, target)
+    columns = [series[field] for field in UPDATE_ARGS[target]]
+    return (lambda k: instrument.update(*[float(column[k]) for column in columns])), instrument.draw
+
+
+def measure_times(update, draw, frames: int, warmup: int) -> tuple:
+    update_times = []
+    draw_times = []
+    for k in range(frames):
+        t0 = time.perf_counter()
+        update(k)
+        t1 = time.perf_counter()
+        draw()
+        t2 = time.perf_counter()
+        if k >= warmup:
+            update_times.append(t1 - t0)
+            draw_times.append(t2 - t1)
+    return update_times, draw_times
+
+
+def measure_allocations(update, draw, frames: int, warmup: int) -> dict:
+    ### Python allocations only, SDL surfaces are allocated outside tracemalloc
+    peaks = []
+    blocks = []
+    tracemalloc.start()
+    try:
+        for k in range(frames):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            update(k)
+            draw()
+            current, peak = tracemalloc.get_traced_memory()
+            if k >= warmup:
+                peaks.append(peak - before)
+                blocks.append(current - before)
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_bytes_per_frame": float(np.mean(peaks)),
+        "retained_bytes_per_frame": float(np.mean(blocks)),
+    }
+
+
+def run_case(resolution: tuple, variant: str, profile: str, options: dict, targets, frames: int, **kwargs) -> list:
+    warmup = kwargs.get("warmup", 20)
+    allocations = kwargs.get("allocations", True)
+    series = get_profile(profile, frames + warmup, variant)
+    pfd = PrimaryFlightDisplay(resolution, headless=True, little=(variant == "little"), **options)
+    pfd.update(series.state(0))
+
+    results = []
+    for target in targets:
+        update, draw = get_steps(pfd, target, series)
+        update_times, draw_times = measure_times(update, draw, frames + warmup, warmup)
+        result = {
+            "resolution": list(resolution),
+            "variant": variant,
+            "profile": profile,
+            "options": options,
+            "target": target,
+            "class": type(pfd if target == "pfd" else getattr(pfd, target)).__name__,
+            "frames": frames,
+            "update": get_stats(update_times),
+            "draw": get_stats(draw_times),
+        }
+        if allocations:
+            result["allocations"] = measure_allocations(update, draw, frames + warmup, warmup)
+        results.append(result)
+    return results
+
+
+def run_benchmark(**kwargs) -> dict:
+    """
+    Benchmark every target (instrument attribute name of PrimaryFlightDisplay or "pfd") of a headless display
+    for each resolution, variant, flight profile and set of PrimaryFlightDisplay options (`configs`).
+    """
+    resolutions = kwargs.get("resolutions", RESOLUTIONS)
+    variants = kwargs.get("variants", VARIANTS)
+    profiles = kwargs.get("profiles", PROFILES)
+    targets = kwargs.get("targets", TARGETS)
+    configs = kwargs.get("configs", [{}])
+    frames = kwargs.get("frames", 300)
+    warmup = kwargs.get("warmup", 20)
+    allocations = kwargs.get("allocations", True)
+
+    results = []
+    for resolution in resolutions:
+        for variant in variants:
+            for profile in profiles:
+                for options in configs:
+                    results += run_case(
+                        tuple(resolution), variant, profile, options, targets, frames,
+                        warmup=warmup, allocations=allocations,
+                    )
+    return {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "frames": frames,
+        "warmup": warmup,
+        "results": results,
+    }
+
+
+def format_summary(report: dict) -> str:
+    lines = []
+    for result in report["results"]:
+        resolution = "x".join(str(x) for x in result["resolution"])
+        options = json.dumps(result["options"], sort_keys=True) if result["options"] else ""
+        lines.append(
+            f"{resolution:>9} {result['variant']:8} {result['profile']:8} {result['target']:18} "
+            f"update {result['update']['mean_ms']:7.3f}/{result['update']['p99_ms']:7.3f} ms  "
+            f"draw {result['draw']['mean_ms']:7.3f}/{result['draw']['p99_ms']:7.3f} ms  {options}"
+        )
+    return "\n".join(lines)
+
+
+def parse_resolution(text: str) -> tuple:
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m pfd.bench", description="Headless benchmark of the PFD instruments."
+    )
+    parser.add_argument("--resolutions", nargs="+", type=parse_resolution, default=RESOLUTIONS, metavar="WxH")
+    parser.add_argument("--variants", nargs="+", choices=VARIANTS, default=VARIANTS)
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=PROFILES)
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=TARGETS)
+    parser.add_argument(
+        "--config",
+        action="append",
+        type=json.loads,
+        dest="configs",
+        metavar="JSON",
+        help='PrimaryFlightDisplay options, repeat to compare, e.g. --config \'{"horizon_engine": "texture"}\'',
+    )
+    parser.add_argument("--compare-horizon", action="store_true", help="add the texture horizon engine configs")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--no-allocations", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", help="write the JSON report to this path instead of stdout")
+    args = parser.parse_args(argv)
+
+    configs = args.configs or [{}]
+    if args.compare_horizon:
+        configs = configs + [
+            {**options, "horizon_engine": "texture", "horizon_roll_step": roll_step}
+            for options in configs
+            for roll_step in (0.0, 1.0)
+        ]
+
+    report = run_benchmark(
+        resolutions=args.resolutions,
+        variants=args.variants,
+        profiles=args.profiles,
+        targets=args.targets,
+        configs=configs,
+        frames=args.frames,
+        warmup=args.warmup,
+        allocations=not args.no_allocations,
+    )
+
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(format_summary(report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
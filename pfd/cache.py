@@ -0,0 +1,79 @@
+"""
+ Copyright (c) 2022 Pablo Ramirez Escudero
+
+ This software is released under the MIT License.
+ https://opensource.org/licenses/MIT
+"""
+
+from collections import OrderedDict
+
+
+class LRUCache:
+    def __init__(self, capacity: int = 256, **kwargs) -> None:
+        self.capacity = capacity
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        ### optional bound on the total weight of the values, e.g. `weigh=surface_bytes` and `max_weight` bytes
+        self.weigh = kwargs.get("weigh", None)
+        self.max_weight = kwargs.get("max_weight", None)
+        self.weights = {}
+        self.weight = 0
+
+    def get(self, key, factory):
+        """Return the value stored for `key`, building it with `factory()` on a miss."""
+        try:
+            value = self.items[key]
+        except KeyError:
+            self.misses += 1
+            value = factory()
+            self.items[key] = value
+            if self.weigh is not None:
+                self.weights[key] = self.weigh(value)
+                self.weight += self.weights[key]
+            self.evict()
+            return value
+        self.hits += 1
+        self.items.move_to_end(key)
+        return value
+
+    def evict(self) -> None:
+        ### the newest value is always kept, even if it weighs more than max_weight on its own
+        while len(self.items) > self.capacity or (
+            self.max_weight is not None and self.weight > self.max_weight and len(self.items) > 1
+        ):
+            key, _ = self.items.popitem(last=False)
+            self.weight -= self.weights.pop(key, 0)
+
+    def set_capacity(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.evict()
+
+    def clear(self) -> None:
+        self.items.clear()
+        self.weights.clear()
+        self.weight = 0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        stats = {
+            "size": len(self.items),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+        if self.weigh is not None:
+            stats["weight"] = self.weight
+            stats["max_weight"] = self.max_weight
+        return stats
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, key) -> bool:
+        return key in self.items
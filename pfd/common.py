@@ -7,6 +7,19 @@
 
 
 import numpy as np
+import pygame
+
+
+def alpha_surface(size: tuple) -> pygame.Surface:
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    ### use the display pixel format when there is one (faster blits), headless surfaces keep their own
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        surface = surface.convert_alpha()
+    return surface
+
+
+def surface_bytes(surface: pygame.Surface) -> int:
+    return surface.get_pitch() * surface.get_height()
 
 
 def quit_out_range(a: np.ndarray, min_val: float, max_val: float):
@@ -17,39 +30,68 @@ def get_digit(number, n):
     return number // 10**n % 10
 
 
+### angle helpers take scalars or numpy arrays, and run in constant time whatever the number of turns
+
+
 def clip_angle_pi(angle: float) -> float:
-    if angle > +np.pi:
-        return angle % -np.pi
-    if angle < -np.pi:
-        return angle % +np.pi
-    return angle
+    ### wrap to (-pi, +pi]
+    return np.pi - (np.pi - angle) % (2.0 * np.pi)
 
 
 def clip_angle_180(angle: float) -> float:
-    angle %= 360
-    if angle > +180.0:
-        return angle % -180.0
-    
-    return angle
+    ### wrap to (-180, +180]
+    return 180.0 - (180.0 - angle) % 360.0
+
 
 def clip_angle_360(angle: float) -> float:
-    angle %= 360
-    if angle == 0.0:
-        return 360.0
-    return angle
+    ### wrap to (0, 360]
+    return 360.0 - (-angle) % 360.0
 
 
 def diff_angle_pi(angle1: float, angle2: float) -> float:
-    while angle1 - angle2 > +np.pi:
-        angle1 = angle1 - 2.0 * np.pi
-    while angle1 - angle2 < -np.pi:
-        angle1 = angle1 + 2.0 * np.pi
-    return angle1 - angle2
+    return clip_angle_pi(angle1 - angle2)
 
 
 def diff_angle_180(angle1: float, angle2: float) -> float:
-    while angle1 - angle2 > +180.0:
-        angle1 = angle1 - 360.0
-    while angle1 - angle2 < -180.0:
-        angle1 = angle1 + 360.0
-    return angle1 - angle2
+    return clip_angle_180(angle1 - angle2)
+
+
+class LookupTable:
+    """
+    Odd function `f(-x) = -f(x)` sampled at `size` evenly spaced values of |x| in [x_min, x_max] and linearly
+    interpolated: zero below `x_min` (e.g. a dead band), clamped beyond `x_max`.
+
+    Python floats are looked up without any numpy call, which would cost more than the function itself on a
+    scalar; arrays are looked up in one vectorized pass.
+    """
+
+    def __init__(self, function, x_max: float, size: int = 4097, x_min: float = 0.0) -> None:
+        self.x_min = x_min
+        self.size = size
+        self.scale = (size - 1) / (x_max - x_min)
+        ### the first sample is taken just above x_min, so that a step of the function there is kept
+        samples = np.linspace(x_min, x_max, size)
+        samples[0] = np.nextafter(x_min, x_max)
+        self.values = function(samples)
+        self.steps = np.append(np.diff(self.values), 0.0)
+        self.values_list = self.values.tolist()
+        self.steps_list = self.steps.tolist()
+
+    def __call__(self, x):
+        if isinstance(x, (int, float)):
+            a = x if x >= 0 else -x
+            if a == 0 or a < self.x_min:
+                return 0.0
+            pos = (a - self.x_min) * self.scale
+            index = int(pos)
+            if index >= self.size - 1:
+                value = self.values_list[-1]
+            else:
+                value = self.values_list[index] + (pos - index) * self.steps_list[index]
+            return value if x > 0 else -value
+        x = np.asarray(x, dtype=float)
+        a = np.abs(x)
+        pos = np.clip((a - self.x_min) * self.scale, 0.0, self.size - 1)
+        index = np.minimum(pos.astype(int), self.size - 2)
+        values = self.values[index] + (pos - index) * self.steps[index]
+        return np.sign(x) * values * (a >= self.x_min)
@@ -0,0 +1,54 @@
+"""
+ Copyright (c) 2022 Pablo Ramirez Escudero
+
+ This software is released under the MIT License.
+ https://opensource.org/licenses/MIT
+"""
+
+import numpy as np
+import pygame
+
+from .cache import LRUCache
+from .fonts import render_text
+
+### process-wide drums keyed by (labels, font size, color, spacing)
+drums = LRUCache(capacity=32)
+
+
+class DigitDrum:
+    """
+    Odometer drum: every label of a rolling digit rendered once in a vertical strip, higher labels on top.
+
+    The strip repeats 3 labels past each end, so the window around any position (label index, fractional
+    while rolling) is blitted in one piece, wrapping from the last label to the first one.
+    """
+
+    wrap = 3
+
+    def __init__(self, labels: tuple, size: int, color, spacing: float) -> None:
+        self.labels = [render_text(label, size, color) for label in labels]
+        self.count = len(self.labels)
+        self.spacing = spacing
+
+        ### even width, so that labels centered on the strip keep the same rounding as labels centered on the box
+        self.width = 2 * int(np.ceil(max(label.get_width() for label in self.labels) / 2))
+        self.padding = int(np.ceil(max(label.get_height() for label in self.labels) / 2))
+        height = 2 * self.padding + (self.count + 2 * self.wrap) * self.spacing
+        self.strip = pygame.Surface((self.width, int(np.ceil(height))), pygame.SRCALPHA)
+        for index in range(-self.wrap, self.count + self.wrap):
+            label = self.labels[index % self.count]
+            self.strip.blit(label, label.get_rect(center=(self.width / 2, self.get_posy(index))))
+
+    def get_posy(self, position: float) -> float:
+        return self.padding + (self.count + self.wrap - position) * self.spacing
+
+    def draw(self, surface: pygame.Surface, position: float, center: tuple) -> None:
+        """Blit the drum on `surface` so that `position` lies on `center`."""
+        posy = center[1] - self.get_posy(position % self.count)
+        surface.blit(self.strip, (round(center[0]) - self.width // 2, round(posy)))
+
+
+def get_drum(labels: tuple, size: int, color, spacing: float) -> DigitDrum:
+    color = tuple(pygame.Color(color))
+    key = (tuple(labels), int(size), color, spacing)
+    return drums.get(key, lambda: DigitDrum(labels, size, color, spacing))
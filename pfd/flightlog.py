@@ -0,0 +1,148 @@
+"""
+ Copyright (c) 2022 Pablo Ramirez Escudero
+
+ This software is released under the MIT License.
+ https://opensource.org/licenses/MIT
+"""
+
+import struct
+
+import numpy as np
+
+from .series import STATE_FIELDS, AircraftStateSeries, get_frames_count
+
+### on-disk layout: a 64 bytes header, then one float64 column of `capacity` values per name in LOG_COLUMNS
+LOG_MAGIC = b"PFDLOG\x00\x01"
+LOG_HEADER = struct.Struct("<8sIIQQ")  # magic, header size, columns count, capacity, frames
+LOG_HEADER_SIZE = 64
+LOG_COLUMNS = ("time",) + STATE_FIELDS
+
+
+def write_header(file, capacity: int, frames: int) -> None:
+    header = LOG_HEADER.pack(LOG_MAGIC, LOG_HEADER_SIZE, len(LOG_COLUMNS), capacity, frames)
+    file.seek(0)
+    file.write(header.ljust(LOG_HEADER_SIZE, b"\x00"))
+
+
+def read_header(file) -> tuple:
+    magic, header_size, columns_count, capacity, frames = LOG_HEADER.unpack(file.read(LOG_HEADER.size))
+    if magic != LOG_MAGIC:
+        raise ValueError("not a PFD flight log")
+    if header_size != LOG_HEADER_SIZE or columns_count != len(LOG_COLUMNS):
+        raise ValueError("unsupported PFD flight log layout")
+    return capacity, frames
+
+
+class FlightLogWriter:
+    """
+    Record a flight log of at most `capacity` frames, row by row or by chunks. Timestamps must not decrease.
+    The frames count in the header is updated by `flush` and `close`, so a log can be read while recording.
+    """
+
+    def __init__(self, path: str, capacity: int) -> None:
+        self.path = path
+        self.capacity = capacity
+        self.frames = 0
+        with open(path, "wb") as file:
+            write_header(file, capacity, 0)
+            file.truncate(LOG_HEADER_SIZE + len(LOG_COLUMNS) * capacity * 8)
+        self.data = np.memmap(
+            path, dtype="<f8", mode="r+", offset=LOG_HEADER_SIZE, shape=(len(LOG_COLUMNS), capacity)
+        )
+
+    def __enter__(self) -> "FlightLogWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def append(self, time: float, state) -> None:
+        self.extend([time], {name: [getattr(state, name)] for name in STATE_FIELDS})
+
+    def extend(self, times, columns) -> None:
+        frames = get_frames_count(columns)
+        if len(times) != frames:
+            raise ValueError("times and columns must have the same length")
+        if self.frames + frames > self.capacity:
+            raise ValueError(f"flight log capacity of {self.capacity} frames exceeded")
+        stop = self.frames + frames
+        self.data[0, self.frames : stop] = times
+        for k, name in enumerate(STATE_FIELDS, start=1):
+            self.data[k, self.frames : stop] = columns[name]
+        self.frames = stop
+
+    def flush(self) -> None:
+        self.data.flush()
+        with open(self.path, "r+b") as file:
+            write_header(file, self.capacity, self.frames)
+
+    def close(self) -> None:
+        if self.data is not None:
+            self.flush()
+            self.data = None
+
+
+def write_flight_log(path: str, times, columns) -> None:
+    """Write a whole flight, `columns` being an AircraftStateSeries or a mapping of field name to array."""
+    with FlightLogWriter(path, len(times)) as writer:
+        writer.extend(times, columns)
+
+
+class FlightLog:
+    """
+    Read-only memory-mapped flight log. Nothing is loaded up front: columns are memmaps paged in on access,
+    `seek` binary-searches the time column and windows are AircraftStateSeries over memmap slices.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as file:
+            self.capacity, self.frames = read_header(file)
+        data = np.memmap(
+            path, dtype="<f8", mode="r", offset=LOG_HEADER_SIZE, shape=(len(LOG_COLUMNS), self.capacity)
+        )
+        self.columns = {name: data[k, : self.frames] for k, name in enumerate(LOG_COLUMNS)}
+        self.times = self.columns["time"]
+
+    def __len__(self) -> int:
+        return self.frames
+
+    def check_not_empty(self) -> None:
+        if self.frames == 0:
+            raise ValueError(f"flight log has no frames: {self.path}")
+
+    @property
+    def start_time(self) -> float:
+        self.check_not_empty()
+        return float(self.times[0])
+
+    @property
+    def end_time(self) -> float:
+        self.check_not_empty()
+        return float(self.times[-1])
+
+    def seek(self, time: float) -> int:
+        """Index of the last frame at or before `time` (the first frame if `time` is before the log)."""
+        self.check_not_empty()
+        index = int(np.searchsorted(self.times, time, side="right")) - 1
+        return min(max(index, 0), self.frames - 1)
+
+    def window(self, start: int, stop: int) -> AircraftStateSeries:
+        return AircraftStateSeries({name: self.columns[name][start:stop] for name in STATE_FIELDS})
+
+    def window_at(self, time: float, frames: int) -> tuple:
+        """`frames` frames from `time`, as (timestamps, AircraftStateSeries)."""
+        start = self.seek(time)
+        stop = min(start + frames, self.frames)
+        return self.times[start:stop], self.window(start, stop)
+
+    def iter_windows(self, start_time: float = None, frames: int = 256):
+        """Yield (timestamps, AircraftStateSeries) windows of `frames` frames from `start_time` to the end."""
+        ### an empty log has no window to yield, whatever the start time
+        start = 0 if start_time is None or self.frames == 0 else self.seek(start_time)
+        for window_start in range(start, self.frames, frames):
+            window_stop = min(window_start + frames, self.frames)
+            yield self.times[window_start:window_stop], self.window(window_start, window_stop)
+
+    def state(self, index: int):
+        return self.window(index, index + 1).state(0)
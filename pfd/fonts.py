@@ -0,0 +1,42 @@
+"""
+ Copyright (c) 2022 Pablo Ramirez Escudero
+
+ This software is released under the MIT License.
+ https://opensource.org/licenses/MIT
+"""
+
+import pygame
+
+from .cache import LRUCache
+
+### process-wide font registry, SysFont lookups are expensive so do them once
+_fonts = {}
+
+### process-wide cache of rendered text surfaces keyed by (font, size, text, color, antialias)
+text_cache = LRUCache(capacity=1024)
+
+
+def get_font(name: str, size: int) -> pygame.font.Font:
+    key = (name, int(size))
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.SysFont(name, int(size))
+        _fonts[key] = font
+    return font
+
+
+def render_text(text: str, size: int, color, name: str = "helvetica", antialias: bool = True) -> pygame.Surface:
+    """Render `text` or return the cached surface. Returned surfaces are shared, never draw on them."""
+    color = tuple(pygame.Color(color))
+    key = (name, int(size), text, color, antialias)
+    return text_cache.get(key, lambda: get_font(name, size).render(text, antialias, color))
+
+
+def set_text_cache_capacity(capacity: int) -> None:
+    text_cache.set_capacity(capacity)
+
+
+def text_cache_stats() -> dict:
+    return text_cache.stats()
@@ -0,0 +1,86 @@
+"""
+ Copyright (c) 2022 Pablo Ramirez Escudero
+
+ This software is released under the MIT License.
+ https://opensource.org/licenses/MIT
+"""
+
+from collections import deque
+
+import numpy as np
+
+### quality levels from full quality down, each one keeps the degradations of the previous ones
+QUALITY_LEVELS = (
+    {},
+    {"decimation": 2},
+    {"decimation": 2, "antialias": False},
+    {"decimation": 3, "antialias": False, "label_roll_step": 2.0},
+    {"decimation": 4, "antialias": False, "label_roll_step": 5.0, "fine_lines": False},
+)
+
+### settings of full quality, for the keys a level does not override
+FULL_QUALITY = {"decimation": 1, "antialias": True, "label_roll_step": None, "fine_lines": True}
+
+
+class QualityGovernor:
+    """
+    Adaptive quality for a display that cannot hold `max_fps`.
+
+    Every frame records its busy time (from the update to the display update, without the wait for the frame
+    rate). When the mean over the last `window` frames exceeds `degrade_ratio` of the frame budget the governor
+    steps one level down QUALITY_LEVELS, when it falls under `restore_ratio` it steps one level back up. After a
+    change the window starts over, so that each decision is taken on frames rendered at the current level.
+    """
+
+    def __init__(self, max_fps: float, **kwargs) -> None:
+        self.budget = 1000.0 / max_fps  # ms
+        self.window = kwargs.get("window", 30)
+        self.degrade_ratio = kwargs.get("degrade_ratio", 0.9)
+        self.restore_ratio = kwargs.get("restore_ratio", 0.6)
+        self.max_level = kwargs.get("max_level", len(QUALITY_LEVELS) - 1)
+
+        self.level = 0
+        self.frame_times = deque(maxlen=self.window)
+        self.frames = 0
+        self.level_frames = np.zeros(len(QUALITY_LEVELS), dtype=int)
+        self.changes = 0
+        self.decisions = deque(maxlen=kwargs.get("decisions_size", 100))
+
+    def settings(self) -> dict:
+        return {**FULL_QUALITY, **QUALITY_LEVELS[self.level]}
+
+    def record(self, frame_time: float) -> bool:
+        """Record the busy time (ms) of a frame, return True if the quality level changed."""
+        self.frames += 1
+        self.level_frames[self.level] += 1
+        self.frame_times.append(frame_time)
+        if len(self.frame_times) < self.window:
+            return False
+        mean_time = sum(self.frame_times) / self.window
+        level = self.level
+        if mean_time > self.degrade_ratio * self.budget and level < self.max_level:
+            level += 1
+        elif mean_time < self.restore_ratio * self.budget and level > 0:
+            level -= 1
+        if level == self.level:
+            return False
+        self.decisions.append(
+            {"frame": self.frames, "from_level": self.level, "to_level": level, "mean_frame_ms": mean_time}
+        )
+        self.level = level
+        self.changes += 1
+        self.frame_times.clear()
+        return True
+
+    def metrics(self) -> dict:
+        mean_time = sum(self.frame_times) / len(self.frame_times) if self.frame_times else None
+        return {
+            "level": self.level,
+            "settings": self.settings(),
+            "budget_ms": self.budget,
+            "mean_frame_ms": mean_time,
+            "frames": self.frames,
+            "level_frames": self.level_frames.tolist(),
+            "changes": self.changes,
+            "decisions": list(self.decisions),
+        }
@@ -0,0 +1,92 @@
+"""
+ Copyright (c) 2022 Pablo Ramirez Escudero
+
+ This software is released under the MIT License.
+ https://opensource.org/licenses/MIT
+"""
+
+import sys
+
+import numpy as np
+import pygame
+
+from .pfd import AircraftState, PrimaryFlightDisplay
+
+
+class PFDGrid:
+    """
+    Several PrimaryFlightDisplay tiled in one window, one panel per vehicle.
+
+    Each panel draws on a subsurface of the window with its own instruments, while fonts, text, drums,
+    rotated labels, tape strips and instrument assets come from the process-wide caches, so panels of the same
+    size share them.
+    Panels are rendered with dirty rects: only the panels updated since the last frame are redrawn, and only
+    their changed instruments are pushed to the display.
+    """
+
+    def __init__(self, resolution: tuple, count: int, **kwargs) -> None:
+        self.resolution = resolution
+        self.count = count
+        self.columns = kwargs.get("columns", int(np.ceil(np.sqrt(count))))
+        self.rows = int(np.ceil(count / self.columns))
+
+        self.headless = kwargs.get("headless", False)
+        if self.headless:
+            pygame.font.init()
+            self.screen = pygame.Surface((self.resolution[0], self.resolution[1]), depth=32)
+        else:
+            pygame.init()
+            self.screen = pygame.display.set_mode((self.resolution[0], self.resolution[1]))
+            pygame.display.set_caption("Primary Flight Display - v1.0")
+        self.game_clock = pygame.time.Clock()
+        self.screen_rect = self.screen.get_rect()
+
+        self.max_fps = kwargs.get("max_fps", None)
+        self.fps = 0.0
+
+        ### every panel gets the same options, e.g. little=True, masked=True, tape_strips=True
+        pfd_kwargs = {"show_fps": False, **kwargs.get("pfd_kwargs", {}), "dirty_rects": True}
+        panel_size = (self.resolution[0] // self.columns, self.resolution[1] // self.rows)
+        self.panel_rects = []
+        self.displays = []
+        for index in range(count):
+            row, column = divmod(index, self.columns)
+            rect = pygame.Rect((column * panel_size[0], row * panel_size[1]), panel_size)
+            self.panel_rects.append(rect)
+            self.displays.append(PrimaryFlightDisplay(panel_size, surface=self.screen.subsurface(rect), **pfd_kwargs))
+
+        self.updated = set()
+        self.dirty_rects = []
+        self.full_update = True
+
+    def update(self, index: int, state: AircraftState, real_time: float = None, sim_time: float = None) -> None:
+        self.displays[index].update(state, real_time, sim_time)
+        self.updated.add(index)
+
+    def draw(self) -> None:
+        ### panels without new state keep their pixels, the others push their dirty rects in window coordinates
+        dirty_rects = []
+        for index in sorted(self.updated):
+            display = self.displays[index]
+            display.draw()
+            offset = self.panel_rects[index].topleft
+            dirty_rects.extend(rect.move(offset) for rect in display.dirty_rects)
+        self.updated.clear()
+        self.dirty_rects = dirty_rects
+        if self.full_update:
+            self.dirty_rects = [self.screen_rect]
+            self.full_update = False
+
+    def render(self) -> None:
+        if not self.headless:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+            if self.dirty_rects:
+                pygame.display.update(self.dirty_rects)
+        if self.max_fps is None:
+            self.game_clock.tick()
+        else:
+            self.game_clock.tick(self.max_fps)
+        self.fps = self.game_clock.get_fps()
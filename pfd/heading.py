@@ -8,7 +8,14 @@
 import numpy as np
 import pygame
 
-from .common import clip_angle_180, clip_angle_360, diff_angle_180
+from .assets import get_assets
+from .cache import LRUCache
+from .common import alpha_surface, clip_angle_180, clip_angle_360, diff_angle_180
+from .fonts import get_font, render_text
+from .layers import StaticLayer
+
+### process-wide compass strips keyed by (class name, size)
+compass_strips = LRUCache(capacity=8)
 
 
 class HeadingIndicator:
@@ -24,8 +31,7 @@ class HeadingIndicator:
         self.vmid = self.height / 2
         self.hmid = self.width / 2
 
-        self.background = pygame.Surface((self.width, self.height))
-        self.background = self.background.convert_alpha()
+        self.background = alpha_surface((self.width, self.height))
         self.background_rect = self.background.get_rect()
         self.background_rect.midtop = self.position
         self.background_color = pygame.Color(100, 100, 100, 200)
@@ -33,6 +39,7 @@ class HeadingIndicator:
         self.indicator_range = 25
         self.indicator_range2 = 50
         self.indicator_marks_num = self.indicator_range2 // 5 + 1
+        self.indicator_marks_offsets = 5.0 * np.arange(self.indicator_marks_num)
         self.angle2width = self.width / self.indicator_range2
         self.lines_length = self.height / 5
         self.lines_length2 = self.lines_length * 2
@@ -41,12 +48,20 @@ class HeadingIndicator:
         self.line_width2 = int(1 + self.size // 400)
         self.line_width3 = int(1 + self.size // 200)
 
-        self.marks_font = pygame.font.SysFont("helvetica", int(self.size // 16.5))
-        self.command_font = pygame.font.SysFont("helvetica", int(self.size // 10.5))
+        self.marks_font_size = int(self.size // 16.5)
+        self.marks_font = get_font("helvetica", self.marks_font_size)
+        self.command_font_size = int(self.size // 10.5)
+        self.command_font = get_font("helvetica", self.command_font_size)
         self.command_separation = int(self.size // 50.0)
 
-        ### pre-compute all constant shapes
-        self.build_constant_elements()
+        self.tape_strips = kwargs.get("tape_strips", False)
+        self.layered = kwargs.get("layered", False)
+        ### dynamic texts (digits, command value) can be rendered without antialiasing
+        self.antialias = kwargs.get("antialias", True)
+
+        ### pre-compute all constant shapes, shared with the indicators of the same size and place
+        key = (type(self).__name__, self.screen_rect.size, self.size, self.position, self.tape_strips, self.layered)
+        vars(self).update(get_assets(key, self, self.build_constant_elements))
 
         ### initialize
         self.update(0.0, 0.0)
@@ -69,6 +84,12 @@ class HeadingIndicator:
             heading_txt_rect = heading_txt.get_rect()
             self.heading_values_txt[heading_value] = (heading_txt, heading_txt_rect)
 
+        ### pre-rendered compass strip, 0-360 deg with wrap padding so that any heading is a single window
+        self.tape_strip = None
+        if self.tape_strips:
+            self.strip_wrap = self.indicator_range + 10.0
+            self.tape_strip = compass_strips.get((type(self).__name__, self.size), self.build_tape_strip)
+
         ### course mark
         self.course_mark_color = pygame.Color("#23FF00")
         self.course_mark_original = [
@@ -108,29 +129,54 @@ class HeadingIndicator:
         h = self.height + self.height / 3 + 10
         self.render_rect = pygame.Rect(x, y, w, h)
 
-    def draw_lines(self) -> None:
-        max_heading_mark = self.bar_max_heading // 5 * 5
-        for kk in range(self.indicator_marks_num):
-            mark = diff_angle_180(max_heading_mark, 5.0 * kk)
-            ang_diff = diff_angle_180(self.heading, mark)
-            incx = ang_diff * self.angle2width
-            mark = clip_angle_360(mark)
-            p1 = (self.hmid - incx, 0)
-            if mark % 10 == 0:
-                p2 = (self.hmid - incx, self.lines_length2)
-                heading_txt, heading_txt_rect = self.heading_values_txt[mark]
-                heading_txt_rect.midtop = p2
-                self.background.blit(heading_txt, heading_txt_rect)
-            else:
-                p2 = (self.hmid - incx, self.lines_length)
+        ### border lines and central mark never move, composite them in one blit
+        self.static_layer = None
+        if self.layered:
+            self.static_layer = StaticLayer(self.screen_rect.size, self.draw_static_elements)
+
+    def build_tape_strip(self) -> pygame.Surface:
+        width = int(np.ceil((360.0 + 2 * self.strip_wrap) * self.angle2width)) + 1
+        strip = alpha_surface((width, self.height))
+        strip.fill(self.background_color)
+        for mark in np.arange(-self.strip_wrap, 360.0 + self.strip_wrap + 5.0, 5.0):
+            self.draw_mark(strip, clip_angle_360(mark), (mark + self.strip_wrap) * self.angle2width)
+        return strip
+
+    def draw_mark(self, surface: pygame.Surface, mark: float, posx: float) -> None:
+        p1 = (posx, 0)
+        if mark % 10 == 0:
+            p2 = (posx, self.lines_length2)
+            heading_txt = self.heading_values_txt[mark][0]
+            surface.blit(heading_txt, heading_txt.get_rect(midtop=p2))
+        else:
+            p2 = (posx, self.lines_length)
 
-            pygame.draw.line(self.background, (255, 255, 255), p1, p2, width=self.line_width2)
+        pygame.draw.line(surface, (255, 255, 255), p1, p2, width=self.line_width2)
 
-    def draw_course_mark(self) -> None:
+    def draw_lines(self) -> None:
+        ### all marks positions in one vectorized pass
+        max_heading_mark = self.bar_max_heading // 5 * 5
+        marks = diff_angle_180(max_heading_mark, self.indicator_marks_offsets)
+        marks_posx = self.hmid - diff_angle_180(self.heading, marks) * self.angle2width
+        marks = clip_angle_360(marks)
+        for mark, posx in zip(marks.tolist(), marks_posx.tolist()):
+            self.draw_mark(self.background, mark, posx)
+
+    def draw_tape_strip(self) -> None:
+        ### window of the compass strip straight on the screen, then the course mark clipped to it
+        posx = round((self.heading % 360.0 + self.strip_wrap) * self.angle2width - self.hmid)
+        area = pygame.Rect(posx, 0, self.background_rect.w, self.background_rect.h)
+        self.screen.blit(self.tape_strip, self.background_rect, area)
+        clip = self.screen.get_clip()
+        self.screen.set_clip(clip.clip(self.background_rect))
+        self.draw_course_mark(self.screen, self.background_rect.topleft)
+        self.screen.set_clip(clip)
+
+    def draw_course_mark(self, surface: pygame.Surface, origin: tuple = (0, 0)) -> None:
         ang_diff = diff_angle_180(self.heading, self.course)
         incx = ang_diff * self.angle2width
-        course_mark = [(mark[0] - incx, mark[1]) for mark in self.course_mark_original]
-        pygame.draw.polygon(self.background, self.course_mark_color, course_mark, width=self.line_width3)
+        course_mark = [(origin[0] + mark[0] - incx, origin[1] + mark[1]) for mark in self.course_mark_original]
+        pygame.draw.polygon(surface, self.course_mark_color, course_mark, width=self.line_width3)
 
     def draw_command_mark(self) -> None:
         ang_diff = diff_angle_180(self.heading, self.command)
@@ -139,45 +185,61 @@ class HeadingIndicator:
             command_mark = [(mark[0] - incx, mark[1]) for mark in self.command_mark_original]
             pygame.draw.polygon(self.screen, self.command_mark_color, command_mark, width=self.line_width3)
 
-        command_value = self.command_font.render(f"{clip_angle_360(self.command):.0f}", True, self.command_mark_color)
+        command_value = render_text(
+            f"{clip_angle_360(self.command):.0f}",
+            self.command_font_size,
+            self.command_mark_color,
+            antialias=self.antialias,
+        )
         command_value_rect = command_value.get_rect()
         command_value_rect.midright = self.background_rect.midleft
         command_value_rect.move_ip(-self.command_separation, 0)
         self.screen.blit(command_value, command_value_rect)
 
-    def draw_central_mark(self) -> None:
-        pygame.draw.polygon(self.screen, (255, 255, 255), self.central_mark, width=self.line_width3)
+    def draw_central_mark(self, surface: pygame.Surface) -> None:
+        pygame.draw.polygon(surface, (255, 255, 255), self.central_mark, width=self.line_width3)
 
-    def draw_border_lines(self) -> None:
-        pygame.draw.line(
-            self.screen, (255, 255, 255), self.border_line_h[0], self.border_line_h[1], width=self.line_width3
-        )
+    def draw_border_lines(self, surface: pygame.Surface) -> None:
+        pygame.draw.line(surface, (255, 255, 255), self.border_line_h[0], self.border_line_h[1], width=self.line_width3)
         pygame.draw.line(
-            self.screen, (255, 255, 255), self.border_line_v1[0], self.border_line_v1[1], width=self.line_width3
+            surface, (255, 255, 255), self.border_line_v1[0], self.border_line_v1[1], width=self.line_width3
         )
         pygame.draw.line(
-            self.screen, (255, 255, 255), self.border_line_v2[0], self.border_line_v2[1], width=self.line_width3
+            surface, (255, 255, 255), self.border_line_v2[0], self.border_line_v2[1], width=self.line_width3
         )
 
-    def update(self, heading: float, course: float, command: float = None) -> None:
-        self.heading = clip_angle_180(heading)
-        self.course = clip_angle_180(course)
+    def draw_static_elements(self, surface: pygame.Surface) -> None:
+        self.draw_border_lines(surface)
+        self.draw_central_mark(surface)
+
+    def compute_update(self, heading, course, command=None) -> dict:
+        ### works on scalars and on whole arrays of samples
+        heading = clip_angle_180(heading)
+        if not command is None:
+            command = clip_angle_180(command)
+        return {
+            "heading": heading,
+            "course": clip_angle_180(course),
+            "command": command,
+            # "bar_min_heading": clip_angle_180(heading - self.indicator_range),
+            "bar_max_heading": clip_angle_180(heading + self.indicator_range),
+        }
 
-        if command is None:
-            self.command = None
-        else:
-            self.command = clip_angle_180(command)
-
-        # self.bar_min_heading = clip_angle_180(self.heading - self.indicator_range)
-        self.bar_max_heading = clip_angle_180(self.heading + self.indicator_range)
+    def update(self, heading: float, course: float, command: float = None) -> None:
+        vars(self).update(self.compute_update(heading, course, command))
 
     def draw(self) -> pygame.Rect:
-        self.background.fill(self.background_color)
-        self.draw_lines()
-        self.draw_course_mark()
-        self.screen.blit(self.background, self.background_rect)
-        self.draw_border_lines()
-        self.draw_central_mark()
+        if self.tape_strip is None:
+            self.background.fill(self.background_color)
+            self.draw_lines()
+            self.draw_course_mark(self.background)
+            self.screen.blit(self.background, self.background_rect)
+        else:
+            self.draw_tape_strip()
+        if self.static_layer is None:
+            self.draw_static_elements(self.screen)
+        else:
+            self.static_layer.draw(self.screen)
         if not self.command is None:
             self.draw_command_mark()
         return self.render_rect
@@ -0,0 +1,82 @@
+"""
+ Copyright (c) 2022 Pablo Ramirez Escudero
+
+ This software is released under the MIT License.
+ https://opensource.org/licenses/MIT
+"""
+
+import numpy as np
+
+from .common import clip_angle_180, diff_angle_180
+from .pfd import AircraftState
+from .series import STATE_FIELDS
+
+### fields interpolated along the shortest arc, e.g. from 179 to -179 deg through 180
+ANGLE_FIELDS = ("roll", "heading", "heading_cmd", "course")
+
+
+class StateBuffer:
+    """
+    Timestamped AircraftState samples, interpolated to the render instant.
+
+    Render at `time - delay` with a delay of about one input period, so that the render instant has samples on
+    both sides: irregular 5-20 Hz telemetry then moves smoothly at the display rate. Past the last sample the
+    last state is held, never extrapolated. Samples not newer than the last one are ignored.
+    """
+
+    def __init__(self, capacity: int = 64, **kwargs) -> None:
+        self.capacity = capacity
+        self.delay = kwargs.get("delay", 0.2)
+        self.times = np.empty(capacity)
+        self.values = np.empty((capacity, len(STATE_FIELDS)))
+        self.count = 0
+        self.angles = np.array([name in ANGLE_FIELDS for name in STATE_FIELDS])
+        self.sampled = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def push(self, time: float, state) -> bool:
+        if self.count and time <= self.times[self.count - 1]:
+            return False
+        if self.count == self.capacity:
+            ### drop the oldest sample, the buffer stays in time order
+            self.times[:-1] = self.times[1:]
+            self.values[:-1] = self.values[1:]
+            self.count -= 1
+        self.times[self.count] = time
+        self.values[self.count] = [getattr(state, name) for name in STATE_FIELDS]
+        self.count += 1
+        return True
+
+    def interpolate(self, time: float) -> np.ndarray:
+        times = self.times[: self.count]
+        index = int(np.searchsorted(times, time, side="right"))
+        ### copies, push() overwrites the rows once the buffer is full
+        if index == 0:
+            return self.values[0].copy()
+        if index == self.count:
+            return self.values[self.count - 1].copy()
+        t = (time - times[index - 1]) / (times[index] - times[index - 1])
+        values0 = self.values[index - 1]
+        values1 = self.values[index]
+        diff = np.where(self.angles, diff_angle_180(values1, values0), values1 - values0)
+        values = values0 + t * diff
+        return np.where(self.angles, clip_angle_180(values), values)
+
+    def sample(self, time: float):
+        """
+        State at `time - delay`, or None if the buffer is empty or the state is the same as the last one
+        returned, so that the caller can skip drawing the frame.
+        """
+        if self.count == 0:
+            return None
+        values = self.interpolate(time - self.delay)
+        if self.sampled is not None and np.array_equal(values, self.sampled):
+            return None
+        self.sampled = values.copy()
+        return AircraftState(*values.tolist())
+
+    def clear(self) -> None:
+        self.count = 0
+        self.sampled = None
@@ -0,0 +1,37 @@
+"""
+ Copyright (c) 2022 Pablo Ramirez Escudero
+
+ This software is released under the MIT License.
+ https://opensource.org/licenses/MIT
+"""
+
+import pygame
+
+### never used by any instrument shape, so it can mark the transparent pixels of a layer
+COLORKEY = (255, 0, 255)
+
+
+class StaticLayer:
+    """
+    Shapes that never move (borders, fixed marks...), drawn once by `draw(surface)` on a surface of `size`
+    and then composited with a single blit at the same place.
+
+    The layer is color-keyed and run-length encoded, cropped to the drawn pixels: it holds solid shapes
+    only (no antialiased text), whose pixels are blitted exactly as they would have been drawn.
+    """
+
+    def __init__(self, size: tuple, draw) -> None:
+        surface = pygame.Surface(size, depth=32)
+        surface.fill(COLORKEY)
+        surface.set_colorkey(COLORKEY)
+        draw(surface)
+
+        self.rect = surface.get_bounding_rect()
+        self.surface = surface.subsurface(self.rect).copy()
+        ### use the display pixel format when there is one (faster blits), headless surfaces keep their own
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert()
+        self.surface.set_colorkey(COLORKEY, pygame.RLEACCEL)
+
+    def draw(self, surface: pygame.Surface) -> pygame.Rect:
+        return surface.blit(self.surface, self.rect)
@@ -0,0 +1,170 @@
+"""
+ Copyright (c) 2022 Pablo Ramirez Escudero
+
+ This software is released under the MIT License.
+ https://opensource.org/licenses/MIT
+"""
+
+import asyncio
+import json
+import time
+
+from .interpolation import StateBuffer
+from .pfd import AircraftState, PrimaryFlightDisplay
+from .series import STATE_FIELDS
+
+
+def decode_json(data: bytes) -> AircraftState:
+    """Decode a JSON object with one key per AircraftState field."""
+    message = json.loads(data)
+    return AircraftState(*[float(message[name]) for name in STATE_FIELDS])
+
+
+def encode_json(state: AircraftState) -> bytes:
+    return json.dumps({name: float(getattr(state, name)) for name in STATE_FIELDS}).encode()
+
+
+class TelemetryProtocol(asyncio.DatagramProtocol):
+    def __init__(self, runner: "LiveRunner") -> None:
+        self.runner = runner
+
+    def datagram_received(self, data: bytes, addr: tuple) -> None:
+        self.runner.feed_datagram(data)
+
+
+class LiveRunner:
+    """
+    Render a PrimaryFlightDisplay from a live telemetry feed inside an asyncio event loop.
+
+    Incoming samples only replace the latest one, they are never queued: samples that arrive faster than
+    `max_fps` are dropped (and counted), and a frame is drawn only when a new sample arrived since the last one.
+    Datagrams are decoded with `decoder(bytes) -> AircraftState`, undecodable datagrams are counted and skipped.
+
+    With `interpolation_delay` (seconds), samples are timestamped on arrival into a StateBuffer instead, and
+    every frame draws the state interpolated at that delay in the past, unless it did not change.
+    """
+
+    def __init__(self, pfd: PrimaryFlightDisplay, **kwargs) -> None:
+        self.pfd = pfd
+        self.max_fps = kwargs.get("max_fps", pfd.max_fps or 60)
+        self.decoder = kwargs.get("decoder", decode_json)
+
+        self.buffer = None
+        if kwargs.get("interpolation_delay", None) is not None:
+            self.buffer = StateBuffer(delay=kwargs["interpolation_delay"])
+
+        self.latest = None
+        self.fresh = False
+        self.running = False
+        ### set by stop() or at the end of run(), consumers started before run() keep feeding until then
+        self.stopped = False
+
+        self.received = 0
+        self.dropped = 0
+        self.errors = 0
+        self.frames = 0
+
+    def feed(self, state) -> None:
+        if self.buffer is not None:
+            self.buffer.push(time.monotonic(), state)
+            self.received += 1
+            return
+        if self.fresh:
+            self.dropped += 1
+        self.latest = state
+        self.fresh = True
+        self.received += 1
+
+    def feed_datagram(self, data: bytes) -> None:
+        try:
+            state = self.decoder(data)
+        except Exception:
+            self.errors += 1
+            return
+        self.feed(state)
+
+    async def consume(self, source) -> None:
+        """Feed every sample of an async iterable, until it is exhausted or the runner is stopped."""
+        async for state in source:
+            if self.stopped:
+                break
+            self.feed(state)
+
+    async def listen_udp(self, host: str, port: int) -> asyncio.DatagramTransport:
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: TelemetryProtocol(self), local_addr=(host, port)
+        )
+        return transport
+
+    async def run(self, duration: float = None) -> None:
+        """Render at `max_fps` until `stop()` is called or `duration` seconds have elapsed."""
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.max_fps
+        start_time = loop.time()
+        next_time = start_time
+        self.stopped = False
+        self.running = True
+        while not self.stopped:
+            now = loop.time()
+            if duration is not None and now - start_time >= duration:
+                break
+            state = None
+            if self.buffer is not None:
+                state = self.buffer.sample(time.monotonic())
+            elif self.fresh:
+                self.fresh = False
+                state = self.latest
+            if state is not None:
+                self.pfd.update(state, now - start_time)
+                self.pfd.draw()
+                self.frames += 1
+            ### the event loop paces the frames, the display clock must not sleep
+            self.pfd.render(wait=False)
+
+            ### never try to catch up with late frames, start a new schedule from now instead
+            next_time += period
+            delay = next_time - loop.time()
+            if delay < 0.0:
+                next_time = loop.time()
+                delay = 0.0
+            await asyncio.sleep(delay)
+        ### consumers stop with the runner, also when the duration ran out
+        self.stopped = True
+        self.running = False
+
+    def stop(self) -> None:
+        self.stopped = True
+
+    def stats(self) -> dict:
+        return {"received": self.received, "dropped": self.dropped, "errors": self.errors, "frames": self.frames}
+
+
+async def send_udp(states, host: str, port: int, rate: float = None, encoder=encode_json) -> int:
+    """Local telemetry stand-in: send `states` as datagrams to (host, port), at `rate` per second if given."""
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol, remote_addr=(host, port))
+    count = 0
+    try:
+        for state in states:
+            transport.sendto(encoder(state))
+            count += 1
+            await asyncio.sleep(0.0 if rate is None else 1.0 / rate)
+    finally:
+        transport.close()
+    return count
+
+
+def run_udp(pfd: PrimaryFlightDisplay, port: int, host: str = "0.0.0.0", **kwargs) -> LiveRunner:
+    """Blocking helper: render the telemetry received on UDP (host, port) until the window is closed."""
+    runner = LiveRunner(pfd, **kwargs)
+
+    async def main() -> None:
+        transport = await runner.listen_udp(host, port)
+        try:
+            await runner.run(kwargs.get("duration", None))
+        finally:
+            transport.close()
+
+    asyncio.run(main())
+    return runner
@@ -0,0 +1,92 @@
+"""
+ Copyright (c) 2022 Pablo Ramirez Escudero
+
+ This software is released under the MIT License.
+ https://opensource.org/licenses/MIT
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .batch import iter_frames
+from .pfd import PrimaryFlightDisplay
+from .series import STATE_FIELDS, AircraftStateSeries, get_frames_count
+
+### headless display owned by each worker process, built once in the pool initializer
+_worker_pfd = None
+
+
+def _init_worker(resolution: tuple, pfd_kwargs: dict) -> None:
+    global _worker_pfd
+    _worker_pfd = PrimaryFlightDisplay(resolution, headless=True, **pfd_kwargs)
+
+
+def _render_chunk(columns: dict, times: np.ndarray, output_path: str, start: int, stop: int):
+    resolution = _worker_pfd.resolution
+    if output_path is None:
+        data = bytearray((stop - start) * resolution[1] * resolution[0] * 3)
+        out = np.frombuffer(data, dtype=np.uint8).reshape(stop - start, resolution[1], resolution[0], 3)
+        for _ in iter_frames(_worker_pfd, columns, times, out=out):
+            pass
+        return data
+
+    out = np.load(output_path, mmap_mode="r+")
+    for _ in iter_frames(_worker_pfd, columns, times, out=out[start:stop]):
+        pass
+    out.flush()
+    del out
+    return None
+
+
+def render_parallel(
+    columns: dict, resolution: tuple, output, times: np.ndarray = None, workers: int = None, **kwargs
+) -> int:
+    """
+    Render `columns` (a mapping of AircraftState field name to array) in a pool of worker processes, each one
+    owning its own headless PrimaryFlightDisplay. The timeline is split in chunks of `chunk_size` frames.
+
+    If `output` is a path, a (frames, height, width, 3) .npy memmap is created and workers write their chunks
+    straight into it. Otherwise `output` is a binary file object (e.g. ffmpeg stdin) and the chunks are written
+    back in order as raw RGB24 frames, keeping at most `max_pending` chunks in memory.
+    Remaining keyword arguments are passed to PrimaryFlightDisplay. Returns the number of frames rendered.
+    """
+    if isinstance(columns, AircraftStateSeries):
+        columns = columns.columns
+    frames = get_frames_count(columns)
+    workers = workers or os.cpu_count() or 1
+    output_path = output if isinstance(output, str) else None
+    chunk_size = kwargs.pop("chunk_size", 256 if output_path else 16)
+    max_pending = kwargs.pop("max_pending", 2 * workers)
+    mp_context = multiprocessing.get_context(kwargs.pop("start_method", "spawn"))
+
+    if output_path is not None:
+        shape = (frames, resolution[1], resolution[0], 3)
+        out = np.lib.format.open_memmap(output_path, mode="w+", dtype=np.uint8, shape=shape)
+        del out
+
+    def chunk_args(start: int) -> tuple:
+        stop = min(start + chunk_size, frames)
+        chunk_columns = {name: np.asarray(columns[name][start:stop]) for name in STATE_FIELDS}
+        chunk_times = None if times is None else np.asarray(times[start:stop])
+        return chunk_columns, chunk_times, output_path, start, stop
+
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=mp_context, initializer=_init_worker, initargs=(resolution, kwargs)
+    ) as executor:
+        ### submit chunks in order and collect them in order, bounding the number of chunks in flight
+        pending = []
+        for start in range(0, frames, chunk_size):
+            pending.append(executor.submit(_render_chunk, *chunk_args(start)))
+            if len(pending) >= max_pending:
+                data = pending.pop(0).result()
+                if output_path is None:
+                    output.write(data)
+        for future in pending:
+            data = future.result()
+            if output_path is None:
+                output.write(data)
+
+    return frames
@@ -8,6 +8,7 @@
 import sys
 from dataclasses import dataclass
 from datetime import timedelta
+from time import perf_counter
 
 import numpy as np
 import pygame
@@ -17,7 +18,11 @@ from .airspeed_little import AirspeedIndicatorLittle
 from .altimeter import AltitudeIndicator
 from .altimeter_little import AltitudeIndicatorLittle
 from .attitude import ArtificalHorizon
+from .cache import LRUCache
+from .fonts import get_font, render_text, set_text_cache_capacity
+from .governor import QualityGovernor
 from .heading import HeadingIndicator
+from .timing import FrameTimings
 from .vspeed import VerticalSpeedIndicator
 from .vspeed_little import VerticalSpeedIndicatoLittle
 
@@ -41,34 +46,177 @@ class AircraftState:
     course: float
 
 
+### AircraftState fields each instrument depends on
+INSTRUMENT_INPUTS = {
+    "artifical_horizon": ("roll", "pitch"),
+    "airspeed_indicator": ("airspeed", "airspeed_cmd"),
+    "altitude_indicator": ("altitude", "altitude_cmd"),
+    "vspeed_indicator": ("vspeed",),
+    "heading_indicator": ("heading", "heading_cmd", "course"),
+}
+
+### instruments updated every `decimation` frames only when the quality governor lowers the quality
+DECIMATED_INSTRUMENTS = ("airspeed_indicator", "altitude_indicator", "vspeed_indicator", "heading_indicator")
+
+### instruments rendering texts that change while flying (digits, command values)
+TEXT_INSTRUMENTS = ("airspeed_indicator", "altitude_indicator", "heading_indicator")
+
+### smallest change of each AircraftState field that makes its instrument dirty
+DIRTY_EPSILONS = {
+    "roll": 0.01,
+    "pitch": 0.01,
+    "airspeed": 0.01,
+    "airspeed_cmd": 0.01,
+    "altitude": 1.0,
+    "altitude_cmd": 1.0,
+    "vspeed": 1.0,
+    "heading": 0.01,
+    "heading_cmd": 0.01,
+    "course": 0.01,
+}
+
+### attributes rebuilt for each resolution
+LAYOUT_ATTRIBUTES = (
+    "size",
+    "unit",
+    "artifical_horizon",
+    "airspeed_indicator",
+    "altitude_indicator",
+    "vspeed_indicator",
+    "heading_indicator",
+    "render_rects",
+    "text_color",
+    "ah_screen",
+    "ah_screen_rect",
+    "instrument_rects",
+    "timings_rect",
+)
+
+
 class PrimaryFlightDisplay:
     def __init__(self, resolution: tuple, **kwargs) -> None:
         self.resolution = resolution
 
-        pygame.init()
+        ### headless mode draws into an in-memory surface, without display nor event queue
+        self.headless = kwargs.get("headless", False)
+        ### resizable windows rebuild the layout on VIDEORESIZE
+        self.display_flags = pygame.RESIZABLE if kwargs.get("resizable", False) else 0
+        ### a given surface (e.g. a panel of PFDGrid) is drawn on as is, its owner handles display and events
+        self.surface = kwargs.get("surface", None)
+        if self.surface is not None:
+            pygame.font.init()
+            self.headless = True
+            self.screen = self.surface
+            self.resolution = self.screen.get_size()
+        elif self.headless:
+            pygame.font.init()
+            self.screen = pygame.Surface((self.resolution[0], self.resolution[1]), depth=32)
+        else:
+            pygame.init()
+            self.screen = pygame.display.set_mode((self.resolution[0], self.resolution[1]), self.display_flags)
+            pygame.display.set_caption("Primary Flight Display - v1.0")
         self.game_clock = pygame.time.Clock()
-        self.screen = pygame.display.set_mode((self.resolution[0], self.resolution[1]))
         self.screen_rect = self.screen.get_rect()
-        pygame.display.set_caption("Primary Flight Display - v1.0")
+        self.frame_pixels = None
 
         self.max_fps = kwargs.get("max_fps", None)
         self.fps = 0.0
+        self.show_fps = kwargs.get("show_fps", True)
+
+        if "text_cache_capacity" in kwargs:
+            set_text_cache_capacity(kwargs["text_cache_capacity"])
+        ### fps and time texts change every frame, render them with the shared font without caching
+        self.info_font = get_font(None, 24)
 
+        self.tape_strips = kwargs.get("tape_strips", False)
+        ### constant chrome of every instrument is pre-rendered once and composited in its own layer
+        self.layered = kwargs.get("layered", False)
+        horizon_keys = (
+            "label_roll_step",
+            "warm_up_labels",
+            "horizon_engine",
+            "horizon_roll_step",
+            "horizon_cache_size",
+            "horizon_cache_bytes",
+        )
+        self.horizon_kwargs = {key: kwargs[key] for key in horizon_keys if key in kwargs}
+        self.masked = kwargs.get("masked", False)
+        self.little = kwargs.get("little", False)
+
+        ### opt-in per-frame timings, `timings=True` or the number of frames kept in the ring buffer
+        timings = kwargs.get("timings", False)
+        self.timings = None
+        if timings:
+            self.timings = FrameTimings(600 if timings is True else int(timings))
+        self.timings_overlay = self.timings is not None and kwargs.get("timings_overlay", False)
+        self.timings_lines = []
+        self.timings_refresh = kwargs.get("timings_refresh", 30)  # frames between overlay percentiles
+        self.last_frame_time = None
+
+        ### opt-in adaptive quality, `adaptive_quality=True` or a dict of QualityGovernor options
+        adaptive_quality = kwargs.get("adaptive_quality", False)
+        self.governor = None
+        if adaptive_quality:
+            if self.max_fps is None:
+                raise ValueError("adaptive quality needs a max_fps")
+            self.governor = QualityGovernor(self.max_fps, **({} if adaptive_quality is True else adaptive_quality))
+        self.decimation = 1
+        self.decimated = False
+        self.updates_count = 0
+        self.snapshots = {}  # last pixels of the decimated instruments
+        self.antialias = True
+        self.frame_start = None
+
+        ### instruments and rects of every resolution used, so resizing back to one of them rebuilds nothing
+        self.layouts = LRUCache(capacity=kwargs.get("layout_cache_size", 4))
+        self.build_layout()
+        self.full_label_roll_step = self.artifical_horizon.label_roll_step
+
+        ### dirty-region rendering
+        self.dirty_rendering = kwargs.get("dirty_rects", False)
+        self.dirty_epsilons = {**DIRTY_EPSILONS, **kwargs.get("dirty_epsilons", {})}
+        self.drawn_values = {}
+        self.dirty_rects = [self.screen_rect]
+        self.info_rect = pygame.Rect(12, 12, 200, 72)
+
+    def build_layout(self) -> None:
         self.size = min(self.resolution)
         self.unit = self.size / 16
 
-        self.artifical_horizon = ArtificalHorizon(self.screen, size=self.size / 2)
-        self.airspeed_indicator = AirspeedIndicator(
+        ### masked mode draws the horizon on its own smaller surface, centered on the screen
+        self.render_rects = [self.screen_rect]
+        self.text_color = (0, 0, 0)
+        if self.masked:
+            self.text_color = (255, 255, 255)
+            self.ah_screen = pygame.Surface((self.resolution[1] / 2, self.resolution[1] / 2))
+            self.ah_screen_rect = self.ah_screen.get_rect()
+            self.ah_screen_rect.center = self.screen_rect.center
+            self.artifical_horizon = ArtificalHorizon(
+                self.ah_screen, size=self.resolution[1] / 2, layered=self.layered, **self.horizon_kwargs
+            )
+        else:
+            self.artifical_horizon = ArtificalHorizon(
+                self.screen, size=self.size / 2, layered=self.layered, **self.horizon_kwargs
+            )
+
+        airspeed_class = AirspeedIndicatorLittle if self.little else AirspeedIndicator
+        altitude_class = AltitudeIndicatorLittle if self.little else AltitudeIndicator
+        vspeed_class = VerticalSpeedIndicatoLittle if self.little else VerticalSpeedIndicator
+        self.airspeed_indicator = airspeed_class(
             self.screen,
             size=self.size / 2,
             position=(self.screen_rect.center[0] - self.unit * 5, self.screen_rect.center[1]),
+            tape_strips=self.tape_strips,
+            layered=self.layered,
         )
-        self.altitude_indicator = AltitudeIndicator(
+        self.altitude_indicator = altitude_class(
             self.screen,
             size=self.size / 2,
             position=(self.screen_rect.center[0] + self.unit * 5, self.screen_rect.center[1]),
+            tape_strips=self.tape_strips,
+            layered=self.layered,
         )
-        self.vspeed_indicator = VerticalSpeedIndicator(
+        self.vspeed_indicator = vspeed_class(
             self.screen,
             size=self.size / 2.5,
             position=(self.altitude_indicator.background_rect.right + self.size / 100, self.screen_rect.center[1]),
@@ -77,41 +225,67 @@ class PrimaryFlightDisplay:
             self.screen,
             size=self.size / 2,
             position=(self.screen_rect.center[0], self.screen_rect.center[1] + self.unit * 5),
+            tape_strips=self.tape_strips,
+            layered=self.layered,
         )
 
-        self.render_rects = [self.screen_rect]
-        self.text_color = (0, 0, 0)
-
-        self.masked = kwargs.get("masked", False)
         if self.masked:
             self.render_rects = self.get_render_rects()
-            self.text_color = (255, 255, 255)
-            self.ah_screen = pygame.Surface((self.resolution[1] / 2, self.resolution[1] / 2))
-            self.ah_screen_rect = self.ah_screen.get_rect()
-            self.ah_screen_rect.center = self.screen_rect.center
-            self.artifical_horizon = ArtificalHorizon(self.ah_screen, size=self.resolution[1] / 2)
 
-        self.little = kwargs.get("little", False)
-        if self.little:
-            self.airspeed_indicator = AirspeedIndicatorLittle(
-                self.screen,
-                size=self.size / 2,
-                position=(self.screen_rect.center[0] - self.unit * 5, self.screen_rect.center[1]),
-            )
-            self.altitude_indicator = AltitudeIndicatorLittle(
-                self.screen,
-                size=self.size / 2,
-                position=(self.screen_rect.center[0] + self.unit * 5, self.screen_rect.center[1]),
-            )
-            self.vspeed_indicator = VerticalSpeedIndicatoLittle(
-                self.screen,
-                size=self.size / 2.5,
-                position=(self.altitude_indicator.background_rect.right + self.size / 100, self.screen_rect.center[1]),
-            )
+        self.instrument_rects = self.get_instrument_rects()
+        self.timings_rect = pygame.Rect(self.resolution[0] - 232, 12, 220, 100)
+        if self.timings_overlay:
+            self.render_rects.append(self.timings_rect)
+
+    def get_layout(self) -> dict:
+        return {name: vars(self)[name] for name in LAYOUT_ATTRIBUTES if name in vars(self)}
+
+    def set_layout(self, layout: dict) -> None:
+        vars(self).update(layout)
+        ### instruments of a cached layout still point to the previous screen surface
+        for name in INSTRUMENT_INPUTS:
+            if name == "artifical_horizon" and self.masked:
+                continue
+            getattr(self, name).screen = self.screen
+
+    def resize(self, resolution: tuple) -> None:
+        """Move the display to a new resolution, reusing the layout of that resolution if it was used before."""
+        resolution = (int(resolution[0]), int(resolution[1]))
+        if resolution == tuple(self.resolution):
+            return
+        if self.surface is not None:
+            raise ValueError("a display drawing on a given surface cannot be resized")
+        self.layouts.get(tuple(self.resolution), self.get_layout)
+        real_time = vars(self).get("real_time", None)
+        sim_time = vars(self).get("sim_time", None)
+
+        self.resolution = resolution
+        if self.headless:
+            self.screen = pygame.Surface(resolution, depth=32)
+        else:
+            self.screen = pygame.display.set_mode(resolution, self.display_flags)
+        self.screen_rect = self.screen.get_rect()
+        self.frame_pixels = None
+
+        if resolution in self.layouts:
+            self.set_layout(self.layouts.get(resolution, None))
+        else:
+            self.build_layout()
+        self.drawn_values = {}
+        self.dirty_rects = [self.screen_rect]
+        self.snapshots = {}
+        if self.governor is not None:
+            self.apply_quality()
+
+        ### show the last state right away, the caller may not draw until a new one arrives
+        if "state" in vars(self):
+            self.update(self.state, real_time, sim_time)
+            self.draw_full()
+            if not self.headless:
+                pygame.display.flip()
 
     def draw_fps(self) -> pygame.Rect:
-        font = pygame.font.SysFont(None, 24)
-        fps_txt = font.render(f"FPS: {self.fps:.0f}", True, self.text_color)
+        fps_txt = self.info_font.render(f"FPS: {self.fps:.0f}", self.antialias, self.text_color)
         fps_txt_rect = fps_txt.get_rect()
         fps_txt_rect.topleft = (12, 12)
         fps_txt_rect.w = 80
@@ -119,9 +293,8 @@ class PrimaryFlightDisplay:
         return fps_txt_rect
 
     def draw_real_time(self) -> pygame.Rect:
-        font = pygame.font.SysFont(None, 24)
-        time_txt = font.render(
-            "real_time: " + str(timedelta(seconds=self.real_time))[:-4], True, self.text_color
+        time_txt = self.info_font.render(
+            "real_time: " + str(timedelta(seconds=self.real_time))[:-4], self.antialias, self.text_color
         )
         time_txt_rect = time_txt.get_rect()
         time_txt_rect.topleft = (12, 36)
@@ -130,31 +303,87 @@ class PrimaryFlightDisplay:
         return time_txt_rect
 
     def draw_sim_time(self) -> pygame.Rect:
-        font = pygame.font.SysFont(None, 24)
-        time_txt = font.render("sim_time: " + str(timedelta(seconds=self.sim_time))[:-4], True, self.text_color)
+        time_txt = self.info_font.render(
+            "sim_time: " + str(timedelta(seconds=self.sim_time))[:-4], self.antialias, self.text_color
+        )
         time_txt_rect = time_txt.get_rect()
         time_txt_rect.topleft = (12, 60)
         time_txt_rect.w = 200
         self.screen.blit(time_txt, time_txt_rect)
         return time_txt_rect
 
+    def draw_timings(self) -> pygame.Rect:
+        ### percentiles over the whole ring buffer are refreshed every `timings_refresh` frames only
+        if not self.timings_lines or self.timings.count % self.timings_refresh == 0:
+            stats = self.timings.percentiles((50, 99))
+            self.timings_lines = [f"FPS: {self.fps:.0f}  p50 / p99 ms"]
+            for section in ("update", "draw", "display", "jitter"):
+                if section in stats:
+                    self.timings_lines.append(
+                        f"{section}: {stats[section]['p50_ms']:.2f} / {stats[section]['p99_ms']:.2f}"
+                    )
+            if self.governor is not None:
+                self.timings_lines.append(f"quality level: {self.governor.level}")
+        for k, line in enumerate(self.timings_lines):
+            line_txt = render_text(line, 20, self.text_color, name=None)
+            line_txt_rect = line_txt.get_rect()
+            line_txt_rect.topleft = (self.timings_rect.left, self.timings_rect.top + 20 * k)
+            self.screen.blit(line_txt, line_txt_rect)
+        return self.timings_rect
+
     def update(self, state: AircraftState, real_time: float = None, sim_time: float = None) -> None:
+        if self.timings is not None:
+            self.timings.start("update")
         self.state = state
+        self.start_update()
         self.artifical_horizon.update(state.roll, state.pitch)
-        self.airspeed_indicator.update(state.airspeed, state.airspeed_cmd)
-        self.altitude_indicator.update(state.altitude, state.altitude_cmd)
-        self.vspeed_indicator.update(state.vspeed)
-        self.heading_indicator.update(state.heading, state.course, state.heading_cmd)
+        if not self.decimated:
+            self.airspeed_indicator.update(state.airspeed, state.airspeed_cmd)
+            self.altitude_indicator.update(state.altitude, state.altitude_cmd)
+            self.vspeed_indicator.update(state.vspeed)
+            self.heading_indicator.update(state.heading, state.course, state.heading_cmd)
         self.real_time = real_time
         self.sim_time = sim_time
+        if self.timings is not None:
+            self.timings.stop("update")
+
+    def start_update(self) -> None:
+        self.frame_start = perf_counter()
+        self.updates_count += 1
+        self.decimated = self.updates_count % self.decimation != 0
+
+    def compute_update(self, state) -> dict:
+        """Update values of every instrument, `state` fields can be scalars or arrays (e.g. AircraftStateSeries)."""
+        return {
+            "artifical_horizon": self.artifical_horizon.compute_update(state["roll"], state["pitch"]),
+            "airspeed_indicator": self.airspeed_indicator.compute_update(state["airspeed"], state["airspeed_cmd"]),
+            "altitude_indicator": self.altitude_indicator.compute_update(state["altitude"], state["altitude_cmd"]),
+            "vspeed_indicator": self.vspeed_indicator.compute_update(state["vspeed"]),
+            "heading_indicator": self.heading_indicator.compute_update(
+                state["heading"], state["course"], state["heading_cmd"]
+            ),
+        }
+
+    def update_from_series(self, series, index: int, real_time: float = None, sim_time: float = None) -> None:
+        """Same as `update` with the row `index` of an AircraftStateSeries, without any per-frame math."""
+        if self.timings is not None:
+            self.timings.start("update")
+        self.start_update()
+        for name, values in series.precompute(self).items():
+            if self.decimated and name in DECIMATED_INSTRUMENTS:
+                continue
+            instrument = vars(getattr(self, name))
+            for attr, column in values.items():
+                instrument[attr] = None if column is None else column[index]
+        self.state = series.state(index)
+        self.real_time = real_time
+        self.sim_time = sim_time
+        if self.timings is not None:
+            self.timings.stop("update")
 
     def get_render_rects(self) -> list:
-        render_rects = []
-        render_rects.append(self.artifical_horizon.draw())
-        render_rects.append(self.airspeed_indicator.draw())
-        render_rects.append(self.altitude_indicator.draw())
-        render_rects.append(self.vspeed_indicator.draw())
-        render_rects.append(self.heading_indicator.draw())
+        ### instruments always draw inside the same rects, only the info texts are drawn to measure them
+        render_rects = list(self.get_instrument_rects().values())
         render_rects.append(self.draw_fps())
         self.real_time = 0.0
         render_rects.append(self.draw_real_time())
@@ -162,6 +391,74 @@ class PrimaryFlightDisplay:
         render_rects.append(self.draw_sim_time())
         return render_rects
 
+    def get_instrument_rects(self) -> dict:
+        instrument_rects = {
+            "artifical_horizon": self.ah_screen_rect if self.masked else self.screen_rect,
+            "airspeed_indicator": self.airspeed_indicator.render_rect,
+            "altitude_indicator": self.altitude_indicator.render_rect,
+            "vspeed_indicator": self.vspeed_indicator.background_rect,
+            "heading_indicator": self.heading_indicator.render_rect,
+        }
+        return instrument_rects
+
+    def get_dirty_instruments(self) -> list:
+        dirty = []
+        for name, fields in INSTRUMENT_INPUTS.items():
+            drawn_values = self.drawn_values.get(name)
+            if drawn_values is not None and self.decimated and name in DECIMATED_INSTRUMENTS:
+                continue
+            if drawn_values is None:
+                dirty.append(name)
+                continue
+            for field, drawn_value in zip(fields, drawn_values):
+                if abs(getattr(self.state, field) - drawn_value) > self.dirty_epsilons[field]:
+                    dirty.append(name)
+                    break
+        return dirty
+
+    def mark_drawn(self, names: list) -> None:
+        for name in names:
+            self.drawn_values[name] = tuple(getattr(self.state, field) for field in INSTRUMENT_INPUTS[name])
+
+    def draw_dirty(self) -> None:
+        dirty = self.get_dirty_instruments()
+        ### unmasked horizon covers the whole screen, once it is dirty the whole frame is
+        if len(dirty) == len(INSTRUMENT_INPUTS) or (not self.masked and "artifical_horizon" in dirty):
+            self.draw_full()
+            self.dirty_rects = [self.screen_rect]
+            self.mark_drawn(dirty)
+            return
+
+        ### masked horizon is drawn on its own surface, so it can be kept between frames
+        layers = ["airspeed_indicator", "vspeed_indicator", "altitude_indicator", "heading_indicator"]
+        if self.masked:
+            if "artifical_horizon" in dirty:
+                self.draw_instrument("artifical_horizon")
+            layers.append("artifical_horizon")
+        else:
+            layers.insert(0, "artifical_horizon")
+
+        self.dirty_rects = [self.instrument_rects[name] for name in dirty]
+        self.dirty_rects.append(self.info_rect)
+        if self.timings_overlay:
+            self.dirty_rects.append(self.timings_rect)
+        if not self.masked:
+            ### every rect shows the horizon below, redraw it once in the union of the rects instead
+            self.dirty_rects = [self.dirty_rects[0].unionall(self.dirty_rects[1:])]
+        for rect in self.dirty_rects:
+            self.screen.set_clip(rect)
+            self.screen.fill((0, 0, 0))
+            for name in layers:
+                if not self.instrument_rects[name].colliderect(rect):
+                    continue
+                if name == "artifical_horizon" and self.masked:
+                    self.screen.blit(self.ah_screen, self.ah_screen_rect)
+                else:
+                    self.draw_instrument(name)
+            self.draw_info()
+        self.screen.set_clip(None)
+        self.mark_drawn(dirty)
+
     def draw_render_rects(self) -> None:
         for rect in self.render_rects:
             pygame.draw.rect(self.screen, (255, 0, 0), rect, width=1)
@@ -179,33 +476,141 @@ class PrimaryFlightDisplay:
             p2 = (self.screen_rect.w, posy)
             pygame.draw.line(self.screen, (255, 255, 0), p1, p2, width=1)
 
+    def draw_instrument(self, name: str) -> pygame.Rect:
+        if self.decimated and name in self.snapshots:
+            ### an instrument not updated this frame keeps the pixels of the last frame it was drawn
+            rect, snapshot = self.snapshots[name]
+            return self.screen.blit(snapshot, rect)
+        if self.timings is None:
+            rect = getattr(self, name).draw()
+        else:
+            self.timings.start(name)
+            rect = getattr(self, name).draw()
+            self.timings.stop(name)
+        ### only over the black of masked mode, unmasked rects also hold the horizon around the instrument
+        if self.masked and self.decimation > 1 and name in DECIMATED_INSTRUMENTS:
+            clip = self.instrument_rects[name].clip(self.screen_rect)
+            self.snapshots[name] = (clip, self.screen.subsurface(clip).copy())
+        return rect
+
+    def draw_info(self) -> None:
+        if self.timings_overlay:
+            self.draw_timings()
+        elif self.show_fps:
+            self.draw_fps()
+        if not self.real_time is None:
+            self.draw_real_time()
+        if not self.sim_time is None:
+            self.draw_sim_time()
+
     def draw(self, debug: bool = False) -> None:
+        if self.timings is not None:
+            self.timings.start("draw")
+        if self.dirty_rendering and not debug:
+            self.draw_dirty()
+        else:
+            self.draw_full(debug)
+            self.dirty_rects = [self.screen_rect]
+        if self.timings is not None:
+            self.timings.stop("draw")
+
+    def draw_full(self, debug: bool = False) -> None:
         self.screen.fill((0, 0, 0))
-        self.artifical_horizon.draw()
-        self.airspeed_indicator.draw()
-        self.vspeed_indicator.draw()
-        self.altitude_indicator.draw()
-        self.heading_indicator.draw()
+        self.draw_instrument("artifical_horizon")
+        self.draw_instrument("airspeed_indicator")
+        self.draw_instrument("vspeed_indicator")
+        self.draw_instrument("altitude_indicator")
+        self.draw_instrument("heading_indicator")
         if debug:
             self.artifical_horizon.draw_aux_axis()
         if self.masked:
             self.screen.blit(self.ah_screen, self.ah_screen_rect)
-        self.draw_fps()
-        if not self.real_time is None:
-            self.draw_real_time()
-        if not self.sim_time is None:
-            self.draw_sim_time()
+        self.draw_info()
 
-    def render(self):
-        ### pygame event handler
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()  # exit pg screen
-                sys.exit()  # exit python script
-        ### pygame screen update (rendering)
-        pygame.display.update(self.render_rects)
-        if self.max_fps is None:
+    def get_frame_view(self) -> np.ndarray:
+        """
+        Zero-copy (height, width, 3) RGB view of the last drawn frame.
+        The view locks the screen surface, delete it before drawing the next frame.
+        """
+        return pygame.surfarray.pixels3d(self.screen).transpose(1, 0, 2)
+
+    def copy_frame(self, out: np.ndarray) -> np.ndarray:
+        """Copy the last drawn frame into `out`, a C-contiguous (height, width, 3) uint8 RGB array."""
+        if self.frame_pixels is None:
+            self.frame_pixels = np.empty((self.screen_rect.h, self.screen_rect.w), dtype=np.uint32)
+        ### rows of the 2d pixels view are contiguous, this is much faster than copying the 3d view
+        view = pygame.surfarray.pixels2d(self.screen)
+        np.copyto(self.frame_pixels, view.T)
+        del view
+        channels = self.frame_pixels.view(np.uint8).reshape(self.screen_rect.h, self.screen_rect.w, 4)
+        for k, shift in enumerate(self.screen.get_shifts()[:3]):
+            byte = shift // 8 if sys.byteorder == "little" else 3 - shift // 8
+            out[..., k] = channels[..., byte]
+        return out
+
+    def render(self, wait: bool = True):
+        if not self.headless:
+            ### pygame event handler
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()  # exit pg screen
+                    sys.exit()  # exit python script
+                if event.type == pygame.VIDEORESIZE:
+                    self.resize(event.size)
+            ### pygame screen update (rendering)
+            if self.timings is not None:
+                self.timings.start("display")
+            if self.dirty_rendering:
+                pygame.display.update(self.dirty_rects)
+            else:
+                pygame.display.update(self.render_rects)
+            if self.timings is not None:
+                self.timings.stop("display")
+        ### busy time of the frame, from the update to the display, without any wait for max_fps
+        busy_time = None if self.frame_start is None else perf_counter() - self.frame_start
+        self.frame_start = None
+        ### without `wait` the clock only measures fps, the caller paces the frames (e.g. an event loop)
+        if self.max_fps is None or not wait:
             self.game_clock.tick()
         else:
             self.game_clock.tick(self.max_fps)
         self.fps = self.game_clock.get_fps()
+        if self.timings is not None:
+            self.record_frame_pacing()
+        if self.governor is not None and busy_time is not None and self.governor.record(1000.0 * busy_time):
+            self.apply_quality()
+
+    def apply_quality(self) -> None:
+        """Apply the settings of the governor quality level to the instruments in use."""
+        settings = self.governor.settings()
+        self.decimation = settings["decimation"]
+        self.snapshots = {}
+        self.antialias = settings["antialias"]
+        for name in TEXT_INSTRUMENTS:
+            getattr(self, name).antialias = self.antialias
+        label_roll_step = settings["label_roll_step"]
+        if label_roll_step is None or label_roll_step < self.full_label_roll_step:
+            label_roll_step = self.full_label_roll_step
+        self.artifical_horizon.label_roll_step = label_roll_step
+        if self.artifical_horizon.fine_lines != settings["fine_lines"]:
+            self.artifical_horizon.fine_lines = settings["fine_lines"]
+            self.artifical_horizon.horizon_views.clear()
+
+    def quality_metrics(self) -> dict:
+        """Quality level, frame times and level changes of the governor, None without adaptive quality."""
+        if self.governor is None:
+            return None
+        return self.governor.metrics()
+
+    def record_frame_pacing(self) -> None:
+        ### frame interval and its deviation from the target interval (or from the previous one without max_fps)
+        now = perf_counter()
+        if self.last_frame_time is not None:
+            interval = now - self.last_frame_time
+            target = self.timings.latest().get("interval", interval)
+            if self.max_fps is not None:
+                target = 1.0 / self.max_fps
+            self.timings.record("interval", interval)
+            self.timings.record("jitter", abs(interval - target))
+        self.last_frame_time = now
+        self.timings.end_frame()
@@ -0,0 +1,74 @@
+"""
+ Copyright (c) 2022 Pablo Ramirez Escudero
+
+ This software is released under the MIT License.
+ https://opensource.org/licenses/MIT
+"""
+
+from dataclasses import fields
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+from .pfd import AircraftState
+
+STATE_FIELDS = tuple(field.name for field in fields(AircraftState))
+
+
+def get_frames_count(columns: dict) -> int:
+    missing = [name for name in STATE_FIELDS if name not in columns]
+    if missing:
+        raise ValueError(f"missing AircraftState columns: {', '.join(missing)}")
+    lengths = {len(columns[name]) for name in STATE_FIELDS}
+    if len(lengths) != 1:
+        raise ValueError("all AircraftState columns must have the same length")
+    return lengths.pop()
+
+
+class AircraftStateSeries:
+    """
+    Time series of AircraftState stored as one NumPy array per field.
+
+    `precompute(pfd)` runs the update math of every instrument of `pfd` once over the whole series
+    (clipping, roll sin/cos, pitch center, tape ranges, digits, heading wraps...), so that
+    `PrimaryFlightDisplay.update_from_series` only has to load the precomputed row of each frame.
+    """
+
+    def __init__(self, columns: dict) -> None:
+        self.size = get_frames_count(columns)
+        self.columns = {name: np.asarray(columns[name], dtype=float) for name in STATE_FIELDS}
+        self.precomputed = WeakKeyDictionary()
+
+    @classmethod
+    def from_states(cls, states: list) -> "AircraftStateSeries":
+        return cls({name: [getattr(state, name) for state in states] for name in STATE_FIELDS})
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def state(self, index: int) -> AircraftState:
+        return AircraftState(*[self.columns[name][index] for name in STATE_FIELDS])
+
+    def slice(self, start: int, stop: int) -> "AircraftStateSeries":
+        return AircraftStateSeries({name: column[start:stop] for name, column in self.columns.items()})
+
+    def precompute(self, pfd) -> dict:
+        """Vectorized update of every instrument of `pfd`, computed once per display and resolution and cached."""
+        ### rows hold the geometry of the current layout, a resized display needs its own
+        layouts = self.precomputed.setdefault(pfd, {})
+        resolution = tuple(pfd.resolution)
+        if resolution not in layouts:
+            instruments = pfd.compute_update(self)
+            ### tuple attributes (points) are stacked in a single (size, n) array
+            for values in instruments.values():
+                for attr, value in values.items():
+                    if isinstance(value, tuple):
+                        values[attr] = np.column_stack(value)
+            layouts[resolution] = instruments
+        return layouts[resolution]
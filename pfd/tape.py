@@ -0,0 +1,72 @@
+"""
+ Copyright (c) 2022 Pablo Ramirez Escudero
+
+ This software is released under the MIT License.
+ https://opensource.org/licenses/MIT
+"""
+
+import numpy as np
+import pygame
+
+from .cache import LRUCache
+
+### process-wide strips, so that instruments of the same class and size share their tiles
+strips = LRUCache(capacity=16)
+
+
+class TapeStrip:
+    """
+    Vertical scale rasterized in fixed-height tiles that are built lazily and evicted when unused.
+
+    The strip uses a global coordinate `y = -value * value2height`, so higher values are drawn on top.
+    Tile `k` covers the rows `[k * tile_height, (k + 1) * tile_height)` and holds every mark whose drawing
+    reaches into them, so adjacent tiles join seamlessly without drawing any pixel twice.
+    """
+
+    def __init__(self, width: float, value2height: float, marks_step: float, draw_mark, **kwargs) -> None:
+        self.width = int(np.ceil(width))
+        self.value2height = value2height
+        self.marks_step = marks_step
+        ### callback(surface, mark, posy, **mark_geometry), a plain function: the strip is process-wide,
+        ### so it must not keep a reference to the instrument (and its screen) that built it
+        self.draw_mark = draw_mark
+        self.mark_geometry = kwargs.get("mark_geometry", {})
+
+        self.tile_height = int(kwargs.get("tile_height", 256))
+        self.margin = kwargs.get("margin", 0.0)  # value span a mark drawing can spill over its position
+        self.min_value = kwargs.get("min_value", None)
+        self.tiles = LRUCache(capacity=kwargs.get("capacity", 6))
+
+    def build_tile(self, index: int) -> pygame.Surface:
+        tile = pygame.Surface((self.width, self.tile_height), pygame.SRCALPHA)
+        top = index * self.tile_height
+        max_value = -top / self.value2height + self.margin
+        min_value = -(top + self.tile_height) / self.value2height - self.margin
+        marks = np.arange(np.ceil(min_value / self.marks_step), np.floor(max_value / self.marks_step) + 1)
+        marks = marks * self.marks_step
+        if self.min_value is not None:
+            marks = marks[marks >= self.min_value]
+        for mark in marks:
+            self.draw_mark(tile, mark, -mark * self.value2height - top, **self.mark_geometry)
+        return tile
+
+    def draw(self, surface: pygame.Surface, value: float, posy: float) -> None:
+        """Blit the strip on `surface` so that `value` lies on row `posy`."""
+        origin = int(round(posy + value * self.value2height))
+        first_tile = (-origin) // self.tile_height
+        last_tile = (surface.get_height() - origin - 1) // self.tile_height
+        for index in range(first_tile, last_tile + 1):
+            tile = self.tiles.get(index, lambda: self.build_tile(index))
+            surface.blit(tile, (0, origin + index * self.tile_height))
+
+    def clear(self) -> None:
+        self.tiles.clear()
+
+
+def get_tape_strip(key: tuple, *args, **kwargs) -> TapeStrip:
+    """
+    Shared TapeStrip for `key`, built with `TapeStrip(*args, **kwargs)` the first time.
+
+    Its tiles capacity is that of the first call and does not grow with the instruments sharing it.
+    """
+    return strips.get(key, lambda: TapeStrip(*args, **kwargs))
@@ -0,0 +1,47 @@
+"""
+ Copyright (c) 2022 Pablo Ramirez Escudero
+
+ This software is released under the MIT License.
+ https://opensource.org/licenses/MIT
+"""
+
+import numpy as np
+
+from .series import STATE_FIELDS
+
+### one little-endian float64 per AircraftState field, in field order (80 bytes per record).
+### float64 values are Python floats, so rows go through the instruments exactly like an AircraftState
+TELEMETRY_DTYPE = np.dtype([(name, "<f8") for name in STATE_FIELDS])
+
+
+def decode_records(data) -> np.recarray:
+    """
+    Zero-copy view of the records packed in `data` (bytes, bytearray, memoryview...).
+
+    Each row has one attribute per AircraftState field, so it can be passed straight to
+    `PrimaryFlightDisplay.update`. Rows share the memory of `data`, copy them if the buffer is reused.
+    """
+    if len(data) % TELEMETRY_DTYPE.itemsize:
+        raise ValueError(f"telemetry data size is not a multiple of {TELEMETRY_DTYPE.itemsize} bytes")
+    return np.frombuffer(data, dtype=TELEMETRY_DTYPE).view(np.recarray)
+
+
+def decode_latest(data) -> np.record:
+    """Last record of `data`, the decoder to use with `LiveRunner` when datagrams pack several samples."""
+    records = decode_records(data)
+    if len(records) == 0:
+        raise ValueError("empty telemetry datagram")
+    return records[-1]
+
+
+def encode_records(columns) -> bytes:
+    """Pack a mapping of AircraftState field name to values (e.g. an AircraftStateSeries) as records."""
+    records = np.empty(len(columns[STATE_FIELDS[0]]), dtype=TELEMETRY_DTYPE)
+    for name in STATE_FIELDS:
+        records[name] = columns[name]
+    return records.tobytes()
+
+
+def encode_state(state) -> bytes:
+    """Pack a single AircraftState as one record."""
+    return np.array(tuple(getattr(state, name) for name in STATE_FIELDS), dtype=TELEMETRY_DTYPE).tobytes()
@@ -0,0 +1,93 @@
+"""
+ Copyright (c) 2022 Pablo Ramirez Escudero
+
+ This software is released under the MIT License.
+ https://opensource.org/licenses/MIT
+"""
+
+from time import perf_counter
+
+import numpy as np
+
+### timed sections of a frame, instrument sections are named after the PrimaryFlightDisplay attributes
+SECTIONS = (
+    "update",
+    "artifical_horizon",
+    "airspeed_indicator",
+    "altitude_indicator",
+    "vspeed_indicator",
+    "heading_indicator",
+    "draw",
+    "display",
+    "interval",
+    "jitter",
+)
+
+
+class FrameTimings:
+    """
+    Ring buffer with the duration in seconds of every section of the last `size` frames.
+
+    Sections not run in a frame (e.g. clean instruments with dirty rects) are NaN. Sections run several times
+    in a frame are added up. A frame is closed by `end_frame`, called from `PrimaryFlightDisplay.render`.
+    """
+
+    def __init__(self, size: int = 600) -> None:
+        self.size = size
+        self.columns = {section: k for k, section in enumerate(SECTIONS)}
+        self.buffer = np.full((size, len(SECTIONS)), np.nan)
+        self.row = np.full(len(SECTIONS), np.nan)
+        self.started = {}
+        self.index = 0
+        self.count = 0
+
+    def start(self, section: str) -> None:
+        self.started[section] = perf_counter()
+
+    def stop(self, section: str) -> None:
+        self.record(section, perf_counter() - self.started.pop(section))
+
+    def record(self, section: str, seconds: float) -> None:
+        column = self.columns[section]
+        if np.isnan(self.row[column]):
+            self.row[column] = seconds
+        else:
+            self.row[column] += seconds
+
+    def end_frame(self) -> None:
+        self.buffer[self.index] = self.row
+        self.row.fill(np.nan)
+        self.index = (self.index + 1) % self.size
+        self.count += 1
+
+    def clear(self) -> None:
+        self.buffer.fill(np.nan)
+        self.row.fill(np.nan)
+        self.started.clear()
+        self.index = 0
+        self.count = 0
+
+    def get_frames(self) -> np.ndarray:
+        """Recorded frames, oldest first, as a (frames, sections) array."""
+        if self.count < self.size:
+            return self.buffer[: self.count]
+        return np.roll(self.buffer, -self.index, axis=0)
+
+    def latest(self) -> dict:
+        if self.count == 0:
+            return {}
+        row = self.buffer[(self.index - 1) % self.size]
+        return {section: float(row[k]) for section, k in self.columns.items() if not np.isnan(row[k])}
+
+    def percentiles(self, q: tuple = (50, 99)) -> dict:
+        """Rolling percentiles in milliseconds of every section recorded in the buffer."""
+        frames = self.buffer[: min(self.count, self.size)]
+        stats = {}
+        for section, k in self.columns.items():
+            values = frames[:, k]
+            values = values[~np.isnan(values)]
+            if len(values) == 0:
+                continue
+            stats[section] = {f"p{p:g}_ms": float(value) for p, value in zip(q, np.percentile(values, q) * 1e3)}
+            stats[section]["mean_ms"] = float(np.mean(values) * 1e3)
+        return stats
@@ -8,6 +8,14 @@
 import numpy as np
 import pygame
 
+from .assets import get_assets
+from .cache import LRUCache
+from .common import LookupTable, alpha_surface
+from .fonts import get_font, render_text
+
+### process-wide pre-rendered backgrounds with their scale, keyed by (class name, size, log scale)
+scales = LRUCache(capacity=8)
+
 
 class VerticalSpeedIndicator:
     def __init__(self, screen: pygame.Surface, *args, **kwargs) -> None:
@@ -22,9 +30,7 @@ class VerticalSpeedIndicator:
         self.vmid = self.height / 2
         self.hmid = self.width / 2
 
-        self.background = pygame.Surface((self.width, self.height))
-        self.background = self.background.convert_alpha()
-        self.background_rect = self.background.get_rect()
+        self.background_rect = pygame.Rect(0, 0, self.width, self.height)
         self.background_rect.midleft = self.position
         self.background_color = pygame.Color(100, 100, 100, 200)
 
@@ -35,7 +41,8 @@ class VerticalSpeedIndicator:
 
         self.height_scale = self.height / 13
 
-        if kwargs.get("log_scale", True):
+        self.log_scale = kwargs.get("log_scale", True)
+        if self.log_scale:
             self.vspeed2heigth = (
                 lambda vspeed: (3.1 * np.log(np.abs(vspeed) + 1) - 0.12) * np.sign(vspeed) * self.height_scale
             )
@@ -47,19 +54,24 @@ class VerticalSpeedIndicator:
         self.line_width3 = int(1 + self.size // 200)
         self.line_width4 = int(1 + self.size // 100)
 
-        self.marks_font = pygame.font.SysFont("helvetica", int(self.size // 16.0))
+        self.marks_font_size = int(self.size // 16.0)
+        self.marks_font = get_font("helvetica", self.marks_font_size)
 
-        self.build_lines()
+        ### pre-compute the scale, shared with the indicators of the same size and place
+        key = (type(self).__name__, self.screen_rect.size, self.size, self.position, self.log_scale)
+        vars(self).update(get_assets(key, self, self.build_lines))
 
         self.update(0.0)
 
     def build_lines(self):
+        ### the hand is looked up in a table of the scale, past 100 (far off the scale) it stops
+        self.hand_table = LookupTable(self.vspeed2heigth, 100.0)
         self.long_lines = []
         self.nums_txt = []
         for num in self.long_lines_nums:
             posy = self.vmid - self.vspeed2heigth(num)
             self.long_lines.append([(self.width / 5, posy), (self.width / 5 + self.long_lines_length, posy)])
-            num_txt = self.marks_font.render(f"{np.abs(num):.0f}", True, (255, 255, 255))
+            num_txt = render_text(f"{np.abs(num):.0f}", self.marks_font_size, (255, 255, 255))
             num_txt_rect = num_txt.get_rect()
             num_txt_rect.midleft = (2, posy)
             self.nums_txt.append((num_txt, num_txt_rect))
@@ -69,29 +81,50 @@ class VerticalSpeedIndicator:
             posy = self.vmid - self.vspeed2heigth(num)
             self.short_lines.append([(self.width / 5, posy), (self.width / 5 + self.short_lines_length, posy)])
 
-    def draw_lines(self):
+        ### the background with its scale never changes, every frame only draws the hand over it
+        key = (type(self).__name__, self.size, self.log_scale)
+        self.background = scales.get(key, self.build_background)
+
+    def build_background(self) -> pygame.Surface:
+        background = alpha_surface((self.width, self.height))
+        background.fill(self.background_color)
+        self.draw_lines(background)
+        return background
+
+    def draw_lines(self, surface: pygame.Surface):
         for kk, line in enumerate(self.long_lines):
-            pygame.draw.line(self.background, (255, 255, 255), line[0], line[1], width=self.line_width3)
-            self.background.blit(self.nums_txt[kk][0], self.nums_txt[kk][1])
+            pygame.draw.line(surface, (255, 255, 255), line[0], line[1], width=self.line_width3)
+            surface.blit(self.nums_txt[kk][0], self.nums_txt[kk][1])
         for line in self.short_lines:
-            pygame.draw.line(self.background, (255, 255, 255), line[0], line[1], width=self.line_width3)
+            pygame.draw.line(surface, (255, 255, 255), line[0], line[1], width=self.line_width3)
 
-    def draw_hand(self):
-        posy = self.vmid - self.vspeed2heigth(self.vspeed)
+    def draw_hand(self, surface: pygame.Surface, origin: tuple = (0, 0)):
+        ### pygame truncates coordinates toward zero, do it before moving them so that a hand above the scale
+        ### (negative y) lands on the same pixels as drawn on the background
         pygame.draw.line(
-            self.background,
+            surface,
             (255, 255, 255),
-            (self.width, self.vmid),
-            (self.long_lines[0][1][0], posy),
+            (origin[0] + int(self.width), origin[1] + int(self.vmid)),
+            (origin[0] + int(self.long_lines[0][1][0]), origin[1] + int(self.hand_posy)),
             width=self.line_width4,
         )
 
+    def compute_update(self, vspeed) -> dict:
+        ### works on scalars and on whole arrays of samples
+        vspeed = vspeed / 1000.0
+        return {
+            "vspeed": vspeed,
+            "hand_posy": self.vmid - self.hand_table(vspeed),
+        }
+
     def update(self, vspeed: float):
-        self.vspeed = vspeed / 1000.0
+        vars(self).update(self.compute_update(vspeed))
 
     def draw(self) -> pygame.Rect:
-        self.background.fill(self.background_color)
-        self.draw_lines()
-        self.draw_hand()
+        ### opaque white hand, drawn on the screen it gives the same pixels as blended from the background
         self.screen.blit(self.background, self.background_rect)
+        clip = self.screen.get_clip()
+        self.screen.set_clip(clip.clip(self.background_rect))
+        self.draw_hand(self.screen, self.background_rect.topleft)
+        self.screen.set_clip(clip)
         return self.background_rect
@@ -0,0 +1,20 @@
+import os
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from pfd import AircraftState, StateBuffer
+
+
+def make_state(roll: float) -> AircraftState:
+    return AircraftState(roll, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+
+def test_sample_after_buffer_is_full():
+    ### held samples must keep coming once push() starts shifting the rows of a full buffer
+    buffer = StateBuffer(capacity=4, delay=0.0)
+    for k in range(10):
+        buffer.push(float(k), make_state(float(k)))
+        state = buffer.sample(float(k))
+        assert state is not None
+        assert state.roll == float(k)
+    assert buffer.sample(9.0) is None